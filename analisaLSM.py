@@ -4,28 +4,6 @@ from scipy import interpolate
 import warnings
 warnings.filterwarnings('ignore')
 
-# Imprime columnas para depuración
-print("Columnas en calculosMuestraRandom.csv antes de procesamiento:")
-df_data = pd.read_csv('calculosMuestraRandom.csv', sep=';', decimal=',', encoding='latin-1')
-print(df_data.columns)
-
-# Renombrar columnas para estandarizar
-df_data = df_data.rename(columns={
-    'Age (d)': 'Age (d)',
-    'Weight (kg)': 'Weight (kg)',
-    'Height (cm)': 'Height (cm)',
-    'Sex': 'Sex',
-})
-
-# Convertir columnas numéricas explícitamente
-numeric_cols = ['Age (d)', 'Weight (kg)', 'Height (cm)', 'IMCEdad', 'WAZ', 'HAZ', 'BAZ', 'PesoEdad', 'TallaEdad', 'difPE', 'difTE', 'difIMCE']
-for col in numeric_cols:
-    if col in df_data.columns:
-        df_data[col] = pd.to_numeric(df_data[col], errors='coerce')
-
-print("Tipos de datos después de conversión:")
-print(df_data.dtypes)
-
 # Función para calcular z-score
 def calculate_zscore(age_days, value, L_func, M_func, S_func):
     if age_days < 0 or value <= 0 or np.isnan(value):
@@ -52,13 +30,8 @@ def load_lms_tables(file_path):
         'female': (interp_la, interp_ma, interp_sa)
     }
 
-lms_tables = load_lms_tables('tablaIMCx.csv')
-
-# Calcular IMC
-df_data['IMC_calculado'] = df_data.apply(lambda row: (float(row['Weight (kg)']) / (float(row['Height (cm)']) / 100) ** 2) if pd.notna(row['Weight (kg)']) and pd.notna(row['Height (cm)']) else np.nan, axis=1)
-
 # Función para calcular z-score
-def apply_zscore(row):
+def apply_zscore(row, lms_tables):
     if row['Sex'] == 'Female':
         interp_L, interp_M, interp_S = lms_tables['female']
         return calculate_zscore(row['Age (d)'], row['IMC_calculado'], interp_L, interp_M, interp_S)
@@ -68,17 +41,52 @@ def apply_zscore(row):
     else:
         return np.nan
 
-# Aplicar el cálculo
-df_data['python_IMCEdad'] = df_data.apply(apply_zscore, axis=1)
+# Recalcular IMC y z-score de IMC/Edad (tablaIMCx) para cada fila; solo cubre hasta
+# los 5 años. `python -m antro conciliar` compara los tres indicadores a cualquier edad
+def recalculate_bmi_zscores(df_data, lms_tables):
+    df_data['IMC_calculado'] = df_data.apply(lambda row: (float(row['Weight (kg)']) / (float(row['Height (cm)']) / 100) ** 2) if pd.notna(row['Weight (kg)']) and pd.notna(row['Height (cm)']) else np.nan, axis=1)
+    df_data['python_IMCEdad'] = df_data.apply(apply_zscore, axis=1, args=(lms_tables,))
+    return df_data
+
+
+def main():
+    # Imprime columnas para depuración
+    print("Columnas en calculosMuestraRandom.csv antes de procesamiento:")
+    df_data = pd.read_csv('calculosMuestraRandom.csv', sep=';', decimal=',', encoding='latin-1')
+    print(df_data.columns)
+
+    # Renombrar columnas para estandarizar
+    df_data = df_data.rename(columns={
+        'Age (d)': 'Age (d)',
+        'Weight (kg)': 'Weight (kg)',
+        'Height (cm)': 'Height (cm)',
+        'Sex': 'Sex',
+    })
+
+    # Convertir columnas numéricas explícitamente
+    numeric_cols = ['Age (d)', 'Weight (kg)', 'Height (cm)', 'IMCEdad', 'WAZ', 'HAZ', 'BAZ', 'PesoEdad', 'TallaEdad', 'difPE', 'difTE', 'difIMCE']
+    for col in numeric_cols:
+        if col in df_data.columns:
+            df_data[col] = pd.to_numeric(df_data[col], errors='coerce')
+
+    print("Tipos de datos después de conversión:")
+    print(df_data.dtypes)
+
+    lms_tables = load_lms_tables('tablaIMCx.csv')
+    df_data = recalculate_bmi_zscores(df_data, lms_tables)
+
+    # Mostrar el dataframe
+    print(df_data[['Age (d)', 'Sex', 'Weight (kg)', 'Height (cm)', 'IMC_calculado', 'IMCEdad', 'python_IMCEdad', 'difIMCE']])
+
+    # Calcular diferencias
+    df_data['diff_python'] = df_data['python_IMCEdad'] - df_data['IMCEdad']
+    print("\nDiferencias con el nuevo cálculo en Python:")
+    print(df_data[['Age (d)', 'Sex', 'IMCEdad', 'python_IMCEdad', 'diff_python', 'difIMCE']])
 
-# Mostrar el dataframe
-print(df_data[['Age (d)', 'Sex', 'Weight (kg)', 'Height (cm)', 'IMC_calculado', 'IMCEdad', 'python_IMCEdad', 'difIMCE']])
+    # Exportar a Excel
+    df_data.to_excel('calculosMuestraRandom_con_zscores.xlsx', index=False, engine='openpyxl')
+    print("Resultados exportados a 'calculosMuestraRandom_con_zscores.xlsx'")
 
-# Calcular diferencias
-df_data['diff_python'] = df_data['python_IMCEdad'] - df_data['IMCEdad']
-print("\nDiferencias con el nuevo cálculo en Python:")
-print(df_data[['Age (d)', 'Sex', 'IMCEdad', 'python_IMCEdad', 'diff_python', 'difIMCE']])
 
-# Exportar a Excel
-df_data.to_excel('calculosMuestraRandom_con_zscores.xlsx', index=False, engine='openpyxl')
-print("Resultados exportados a 'calculosMuestraRandom_con_zscores.xlsx'")
+if __name__ == '__main__':
+    main()
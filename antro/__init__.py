@@ -0,0 +1,56 @@
+# Cálculo de z-scores antropométricos (Peso/Edad, Talla/Edad, IMC/Edad) con tablas LMS.
+# Los submódulos se importan en el primer acceso para que `import antro` no cargue
+# numpy, pandas ni las tablas. El perfilado se activa con antro.profiling.profiling
+# (no se exporta acá: el nombre es el del submódulo, que se carga con cualquier cálculo).
+import importlib
+
+_EXPORTS = {
+    'calculate_age_days': 'age',
+    'age_breakdown': 'age',
+    'format_age': 'age',
+    'parse_dates': 'age',
+    'classify_height': 'classification',
+    'classify_weight': 'classification',
+    'calculate_zscore': 'zscore',
+    'calculate_zscore_batch': 'zscore',
+    'lms_zscores': 'zscore',
+    'calculate_zscores_batch': 'zscore',
+    'calculate_measurement_batch': 'zscore',
+    'calculate_measurements': 'zscore',
+    'sd_curves': 'zscore',
+    'get_interpolated_lms': 'lms',
+    'get_interpolated_lms_batch': 'lms',
+    'get_lms_grid': 'lms',
+    'load_lms_grid': 'lms',
+    'compile_lms_grid': 'lms',
+    'load_lms_tables': 'lms',
+    'compact_records': 'records',
+    'expand_records': 'records',
+    'bytes_per_row': 'records',
+    'PrevalenceAccumulator': 'prevalence',
+    'accumulate_files': 'prevalence',
+    'ReconciliationAccumulator': 'reconcile',
+    'reconcile_file': 'reconcile',
+    'bootstrap_agreement': 'bootstrap',
+    'ConnectionPool': 'db',
+    'score_table': 'db',
+    'sqlite_pool': 'db',
+    'ScoringService': 'service',
+    'serve': 'service',
+    'LMSCache': 'cache',
+    'Profiler': 'profiling',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'antro' has no attribute '{name}'")
+    value = getattr(importlib.import_module('.' + _EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
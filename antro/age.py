@@ -0,0 +1,50 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = '%d/%m/%Y'
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+# Convertir fechas 'dd/mm/aaaa' a días desde 1970-01-01 (NaN si son inválidas).
+# Cada fecha distinta se interpreta una sola vez: en una campaña casi todas las
+# filas comparten la FechaControl
+def parse_dates(values, fmt=DATE_FORMAT):
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=fmt, errors='coerce')
+    days = (parsed.to_numpy(dtype='datetime64[D]') - _EPOCH).astype(float)
+    days[parsed.isna().to_numpy()] = np.nan
+    out = np.full(len(codes), np.nan)
+    known = codes >= 0
+    out[known] = days[codes[known]]
+    return out
+
+
+# Edad en días entre FechaNacimiento y FechaControl. Fechas inválidas, nacimientos
+# posteriores al control o controles posteriores a `today` quedan como NaN
+def calculate_age_days(fecha_nacimiento, fecha_control, today=None, fmt=DATE_FORMAT):
+    nacimiento = parse_dates(fecha_nacimiento, fmt)
+    control = parse_dates(fecha_control, fmt)
+    today = today or datetime.date.today()
+    limite = float((np.datetime64(today, 'D') - _EPOCH).astype(int))
+    age_days = control - nacimiento
+    with np.errstate(invalid='ignore'):
+        age_days[(age_days < 0) | (control > limite)] = np.nan
+    return age_days
+
+
+# Desglose de la edad como en calcula_generados.sql:
+# FLOOR(d / 365.25), FLOOR((d % 365.25) / 30.4375), FLOOR(d % 30.4375)
+def age_breakdown(age_days):
+    age_days = np.asarray(age_days, dtype=float)
+    years = np.floor(age_days / 365.25)
+    months = np.floor(np.fmod(age_days, 365.25) / 30.4375)
+    days = np.floor(np.fmod(age_days, 30.4375))
+    return years, months, days
+
+
+# Edad en formato 'xA xM xD' (None si la edad es NaN)
+def format_age(age_days):
+    parts = [pd.Series(a).astype('Int64').astype('string') for a in age_breakdown(age_days)]
+    return (parts[0] + 'A ' + parts[1] + 'M ' + parts[2] + 'D').to_numpy(dtype=object, na_value=None)
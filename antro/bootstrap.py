@@ -0,0 +1,142 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .reconcile import COMPARISONS, REFERENCE_OPTIONS, VARIABLES, reference_matrix
+
+# Estadísticos de concordancia de cada comparación (diferencia = a - b)
+STATISTICS = ['sesgo', 'rmse', 'loa_inf', 'loa_sup', 'r']
+# Pesos por bloque de réplicas: el bloque recorre los datos en tramos de filas para que
+# la matriz de pesos (réplicas × filas del tramo) tenga a lo sumo estos elementos
+BLOCK_ELEMENTS = 1 << 20
+# Variables que usan las comparaciones (la diferencia, a y b), en el orden de las
+# columnas de los datos
+COLUMNS = [v for v in VARIABLES if any(v in c for c in COMPARISONS)]
+_D = np.array([COLUMNS.index(name) for name, _, _ in COMPARISONS])
+_A = np.array([COLUMNS.index(a) for _, a, _ in COMPARISONS])
+_B = np.array([COLUMNS.index(b) for _, _, b in COMPARISONS])
+
+# Datos del proceso (centrados por columna) y su desplazamiento
+_data = None
+_shift = None
+_shm = None
+
+
+# Cargar las columnas de las comparaciones de un archivo de referencia, por bloques;
+# con `estrato` 'F' o 'M' solo las filas de ese sexo
+def load_comparison_data(path, estrato='Todos', chunk_size=250_000):
+    cols = [VARIABLES.index(c) for c in COLUMNS]
+    parts = []
+    for chunk in pd.read_csv(path, chunksize=chunk_size, **REFERENCE_OPTIONS):
+        X, sex = reference_matrix(chunk)
+        if estrato != 'Todos':
+            X = X[sex == ('F', 'M').index(estrato)]
+        parts.append(X[:, cols])
+    return np.concatenate(parts) if parts else np.empty((0, len(COLUMNS)))
+
+
+# Aportes de cada fila a las sumas de los estadísticos (filas × 9 × comparaciones),
+# con NaN por pares como en la conciliación: la diferencia cuenta donde tiene dato y
+# la correlación donde lo tienen a y b. Las sumas de una réplica son pesos @ aportes
+def _features(X, shift):
+    D = X[:, _D]
+    valid_d = ~np.isnan(D)
+    D = np.where(valid_d, D + shift[_D], 0.0)
+    A, B = X[:, _A], X[:, _B]
+    valid = ~(np.isnan(A) | np.isnan(B))
+    A = np.where(valid, A, 0.0)
+    B = np.where(valid, B, 0.0)
+    return np.stack([valid_d, D, D * D, valid, A, B, A * A, B * B, A * B], axis=1).reshape(len(X), -1)
+
+
+# Estadísticos a partir de las sumas (9 × réplicas × comparaciones): sesgo, RMSE,
+# límites de concordancia de Bland-Altman (sesgo ± 1.96 DE) y r de Pearson entre a y b
+def _statistics(sums):
+    n_d, sd, sdd, n, sa, sb, saa, sbb, sab = sums
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bias = sd / n_d
+        sd_diff = np.sqrt(np.maximum(sdd - sd * sd / n_d, 0.0) / (n_d - 1))
+        r = (sab - sa * sb / n) / np.sqrt((saa - sa * sa / n) * (sbb - sb * sb / n))
+        return np.stack([bias, np.sqrt(sdd / n_d), bias - 1.96 * sd_diff, bias + 1.96 * sd_diff, np.clip(r, -1, 1)])
+
+
+# Un bloque de réplicas. Cada réplica sortea n filas con reposición: primero cuántas
+# caen en cada tramo de filas (multinomial) y dentro del tramo cuáles; las repeticiones
+# de cada fila dan pesos por réplica y las sumas salen de un producto de matrices con
+# los aportes del tramo. La memoria depende de block_elements (réplicas × filas del
+# tramo), no de n. El sorteo depende de la semilla, del tamaño del bloque y de
+# block_elements
+def _bootstrap_block(task):
+    seed, replicates, block_elements = task
+    rng = np.random.default_rng(seed)
+    n = len(_data)
+    rows = max(1, block_elements // replicates)
+    starts = range(0, n, rows)
+    sizes = np.array([min(rows, n - start) for start in starts])
+    counts = rng.multinomial(n, sizes / n, size=replicates)  # réplicas × tramos
+    total = 0.0
+    for k, start in enumerate(starts):
+        size = int(sizes[k])
+        replica = np.repeat(np.arange(replicates), counts[:, k])
+        picks = rng.integers(0, size, len(replica))
+        weights = np.bincount(replica * size + picks, minlength=replicates * size).reshape(replicates, size)
+        total = total + weights @ _features(_data[start:start + size], _shift)
+    return _statistics(total.reshape(replicates, 9, -1).transpose(1, 0, 2))
+
+
+def _set_data(data):
+    global _data, _shift
+    with np.errstate(invalid='ignore'):
+        _shift = np.nan_to_num(np.nanmean(data, axis=0)) if len(data) else np.zeros(data.shape[1])
+    _data = data - _shift
+
+
+def _attach_data(name, shape, dtype, shift):
+    global _shm, _data, _shift
+    _shm = shared_memory.SharedMemory(name=name)
+    _data = np.ndarray(shape, dtype=dtype, buffer=_shm.buf)
+    _shift = shift
+
+
+# Intervalos de confianza bootstrap (percentiles) de los estadísticos de
+# concordancia. Las réplicas se agrupan en bloques de `block` con una semilla propia
+# derivada de `seed` (SeedSequence.spawn): el resultado es el mismo con cualquier
+# número de procesos. Con workers > 1 los bloques se reparten entre procesos que
+# comparten los datos en memoria compartida
+def bootstrap_agreement(data, replicates=1000, seed=0, level=0.95, workers=1, block=50,
+                        block_elements=BLOCK_ELEMENTS):
+    data = np.ascontiguousarray(data, dtype=float)
+    _set_data(data)
+    rows = max(1, block_elements // len(COLUMNS))
+    estimate = sum(_features(_data[i:i + rows], _shift).sum(axis=0) for i in range(0, len(_data), rows))
+    estimate = _statistics(np.reshape(estimate, (9, 1, -1)))[:, 0]
+
+    sizes = [min(block, replicates - i) for i in range(0, replicates, block)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, size, block_elements) for s, size in zip(seeds, sizes)]
+    if workers > 1 and len(tasks) > 1:
+        shm = shared_memory.SharedMemory(create=True, size=max(_data.nbytes, 1))
+        try:
+            np.ndarray(_data.shape, dtype=_data.dtype, buffer=shm.buf)[...] = _data
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_attach_data,
+                                     initargs=(shm.name, _data.shape, _data.dtype.str, _shift)) as pool:
+                results = list(pool.map(_bootstrap_block, tasks))
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        results = [_bootstrap_block(task) for task in tasks]
+    samples = np.concatenate(results, axis=1)  # estadístico × réplica × comparación
+
+    alpha = (1 - level) / 2
+    with np.errstate(invalid='ignore'):
+        low, high = np.nanquantile(samples, [alpha, 1 - alpha], axis=1)
+    records = []
+    for s, stat in enumerate(STATISTICS):
+        for c, (name, a, b) in enumerate(COMPARISONS):
+            records.append({'diferencia': name, 'comparacion': f'{a} - {b}', 'estadistico': stat,
+                            'estimacion': estimate[s, c], 'ic_inf': low[s, c], 'ic_sup': high[s, c]})
+    return pd.DataFrame(records), samples
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .lms import LMS_MAX_DAYS, LMS_SEXES, get_interpolated_lms_batch
+
+
+# Cache LRU de L, M y S por (indicador, sexo, edad en días) delante de
+# get_interpolated_lms_batch, solo para edades fraccionarias: las enteras ya son un
+# acceso directo a la grilla compilada y van sin pasar por el cache, igual que las
+# edades NaN o fuera de la tabla. Dentro de cada lote las claves repetidas se buscan
+# una sola vez; las que faltan se calculan juntas con la misma función, así que el
+# resultado es idéntico al de la búsqueda sin cache. Conviene cuando las edades
+# fraccionarias se repiten (p. ej. edades en meses pasadas a días); con edades
+# fraccionarias casi todas distintas es más lento que no usarlo. Se pasa como `cache`
+# a calculate_zscores_batch; los comandos de la CLI calculan la edad de las fechas en
+# días enteros y no lo usan
+class LMSCache:
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.rows = 0
+
+    def get_batch(self, indicator, age_days, sexo):
+        age_days = np.asarray(age_days, dtype=float)
+        sexo = np.asarray(sexo)
+        self.rows += len(age_days)
+        with np.errstate(invalid='ignore'):
+            cached = (age_days != np.floor(age_days)) & (age_days >= 0) & (age_days <= LMS_MAX_DAYS)
+        if not cached.any():
+            return get_interpolated_lms_batch(indicator, age_days, sexo)
+        L = np.full(age_days.shape, np.nan)
+        M = np.full(age_days.shape, np.nan)
+        S = np.full(age_days.shape, np.nan)
+        if not cached.all():
+            direct = ~cached
+            L[direct], M[direct], S[direct] = get_interpolated_lms_batch(indicator, age_days[direct], sexo[direct])
+        for sex in LMS_SEXES:
+            mask = cached & (sexo == sex)
+            if not mask.any():
+                continue
+            ages, inverse = np.unique(age_days[mask], return_inverse=True)
+            lms = self._lookup(indicator, sex, ages)
+            L[mask], M[mask], S[mask] = lms[inverse].T
+        return L, M, S
+
+    # L, M y S (una fila por edad) para edades únicas de un sexo
+    def _lookup(self, indicator, sex, ages):
+        out = np.empty((len(ages), 3))
+        missing = []
+        for i, age in enumerate(ages.tolist()):
+            key = (indicator, sex, age)
+            value = self._data.get(key)
+            if value is None:
+                missing.append(i)
+            else:
+                self._data.move_to_end(key)
+                out[i] = value
+        self.hits += len(ages) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            new_ages = ages[missing]
+            out[missing] = np.column_stack(get_interpolated_lms_batch(indicator, new_ages, np.full(len(missing), sex)))
+            for age, value in zip(new_ages.tolist(), out[missing]):
+                self._data[(indicator, sex, age)] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return out
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'filas': self.rows,
+            'aciertos': self.hits,
+            'fallos': self.misses,
+            'tasa_aciertos': self.hits / lookups if lookups else 0.0,
+            'entradas': len(self._data),
+            'maxsize': self.maxsize,
+        }
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = self.rows = 0
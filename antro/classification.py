@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+# Categorías de calcula_generados.sql
+WEIGHT_CATEGORIES = ['MBP', 'BP', 'RBP', 'SP', 'AD', 'Error']
+HEIGHT_CATEGORIES = ['MBT', 'BT', 'RBT', 'AD', 'AT', 'Error']
+
+
+# Evaluar las ramas del CASE en orden. Las comparaciones con NaN dan False, igual que
+# un WHEN con NULL en SQL; una fila sin ninguna rama verdadera queda sin categoría
+# (el CASE no tiene ELSE)
+def _case(branches, categories):
+    conditions = [cond for cond, _ in branches]
+    codes = [np.int8(categories.index(cat)) for _, cat in branches]
+    return pd.Categorical.from_codes(np.select(conditions, codes, default=np.int8(-1)), categories=categories)
+
+
+# ClasificacionPeso a partir de PesoEdad, IMCEdad y DiasEdad
+def classify_weight(peso_edad_z, imc_edad_z, age_days):
+    pe = np.asarray(peso_edad_z, dtype=float)
+    imc = np.asarray(imc_edad_z, dtype=float)
+    imc_2y = np.asarray(age_days, dtype=float) > 730  # IMC/Edad solo cuenta a partir de los 2 años
+    return _case([
+        ((pe > 6) | (imc > 6) | (pe < -6) | (imc < -6), 'Error'),
+        (((imc < -3) & imc_2y) | (pe < -3), 'MBP'),
+        (((imc > -3) & (imc <= -2) & imc_2y) | (pe < -2), 'BP'),
+        (((imc > -2) & (imc <= -1.5) & imc_2y) | (pe < -1.5), 'RBP'),
+        (((imc > 2) & imc_2y) | (pe > 2), 'SP'),
+        ((pe >= -1.5) & (pe < 2), 'AD'),
+    ], WEIGHT_CATEGORIES)
+
+
+# ClasificacionTalla a partir de TallaEdad
+def classify_height(talla_edad_z):
+    te = np.asarray(talla_edad_z, dtype=float)
+    return _case([
+        ((te > 6) | (te < -6), 'Error'),
+        (te <= -3, 'MBT'),
+        ((te <= -2) & (te > -3), 'BT'),
+        ((te <= -1.5) & (te > -2), 'RBT'),
+        ((te > -1.5) & (te > -2), 'AD'),
+        (te >= -2, 'AT'),  # Igual que en el SQL: las ramas anteriores ya cubren todo te >= -2
+    ], HEIGHT_CATEGORIES)
@@ -0,0 +1,244 @@
+import argparse
+import sys
+import warnings
+
+from .pipeline import read_controls, score_controls, score_file_chunked
+from .profiling import Profiler, get_profiler, profiling
+from .writers import WRITERS, output_format, write_dataframe
+
+warnings.filterwarnings('ignore')
+
+
+def cmd_puntuar(args):
+    if args.incremental:
+        from .incremental import score_incremental
+
+        try:
+            score_incremental(args.entrada, args.salida, estado=args.estado, key=args.clave, workers=args.procesos,
+                              formato=args.formato)
+        except ValueError as e:
+            sys.exit(f"Error: {e}")
+    elif args.bloque:
+        total = score_file_chunked(args.entrada, args.salida, chunk_size=args.bloque, workers=args.procesos,
+                                   formato=args.formato)
+        print(f"{total} filas exportadas a '{args.salida}'")
+    else:
+        df_data = score_controls(read_controls(args.entrada), workers=args.procesos)
+        show_and_export(df_data, args.salida, args.formato)
+
+
+def show_and_export(df_data, salida, formato=None):
+    # Mostrar resultados
+    print(df_data[['FechaNacimiento', 'FechaControl', 'Sexo', 'Peso', 'Talla', 'IMC_calculado', 'PesoEdad_Z', 'TallaEdad_Z', 'IMCEdad_Z']])
+
+    # Exportar (Excel por defecto; CSV, Parquet o Feather según la extensión)
+    with get_profiler().stage('exportar', len(df_data)):
+        write_dataframe(df_data, salida, formato)
+    print(f"Resultados exportados a '{salida}'")
+
+
+def cmd_prevalencia(args):
+    from .prevalence import accumulate_files, load_accumulator, save_accumulator
+
+    acc = accumulate_files(args.entradas, chunk_size=args.bloque, workers=args.procesos)
+    for path in args.sumar:
+        acc.merge(load_accumulator(path))
+    if args.guardar:
+        save_accumulator(args.guardar, acc)
+    table = acc.table()
+    print(f"{acc.rows} filas ({acc.excluded} sin sexo o edad válidos)")
+    print(table[['Sexo', 'Edad', 'filas'] + [c for c in table.columns if c.endswith('_%')]].round(1).to_string(index=False))
+    if args.salida:
+        write_dataframe(table, args.salida, args.formato)
+        print(f"Prevalencias exportadas a '{args.salida}'")
+
+
+def cmd_conciliar(args):
+    from .reconcile import COMPARISONS, reconcile_file
+
+    acc = reconcile_file(args.entrada, chunk_size=args.bloque)
+    agreement = acc.agreement()
+    print("=== CONCORDANCIA (diferencia = minuendo - sustraendo) ===")
+    print(agreement.round(4).to_string(index=False))
+
+    r, p, n = acc.correlations('Todos')
+    diffs = [name for name, _, _ in COMPARISONS]
+    others = [v for v in acc.variables if v not in diffs]
+    print("\n=== CORRELACIONES DE LAS DIFERENCIAS (Pearson, NaN por pares) ===")
+    print(r.loc[diffs, others].round(3).to_string())
+    print("\np-valores:")
+    print(p.loc[diffs, others].round(3).to_string())
+
+    if args.salida:
+        write_dataframe(agreement, args.salida, args.formato)
+        print(f"Concordancia exportada a '{args.salida}'")
+    if args.correlaciones:
+        write_dataframe(acc.correlation_table(), args.correlaciones)
+        print(f"Correlaciones exportadas a '{args.correlaciones}'")
+
+    if args.bootstrap:
+        from .bootstrap import bootstrap_agreement, load_comparison_data
+
+        data = load_comparison_data(args.entrada, args.estrato, chunk_size=args.bloque)
+        table, _ = bootstrap_agreement(data, args.bootstrap, seed=args.semilla, level=args.nivel, workers=args.procesos)
+        print(f"\n=== INTERVALOS BOOTSTRAP {args.nivel:.0%} ({args.bootstrap} réplicas, estrato {args.estrato}, n={len(data)}) ===")
+        print(table.pivot(index='diferencia', columns='estadistico', values=['estimacion', 'ic_inf', 'ic_sup'])
+              .swaplevel(axis=1).sort_index(axis=1).round(4).to_string())
+        if args.ic:
+            write_dataframe(table, args.ic)
+            print(f"Intervalos exportados a '{args.ic}'")
+
+
+def cmd_bd(args):
+    import sqlite3
+
+    from .db import score_table, sqlite_pool
+
+    pool = sqlite_pool(args.base)
+    try:
+        summary = score_table(pool, args.origen, args.destino, key=args.clave, batch_size=args.lote,
+                              upsert=args.upsert, workers=args.procesos)
+    except sqlite3.IntegrityError as e:
+        sys.exit(f"Error: {e} (con --upsert se actualizan las claves que ya están en '{args.destino}')")
+    finally:
+        pool.close()
+    print(f"{summary['filas']} filas en {summary['segundos']:.2f} s: lectura {summary['lectura_filas_s']:,.0f} filas/s, "
+          f"escritura {summary['escritura_filas_s']:,.0f} filas/s")
+
+
+def cmd_servir(args):
+    import asyncio
+
+    from .service import serve
+
+    try:
+        asyncio.run(serve(args.host, args.puerto, window=args.ventana_ms / 1000, max_batch=args.lote_max))
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_generar(args):
+    from .generator import write_generated
+
+    total = write_generated(args.salida, args.filas, chunk_size=args.bloque, seed=args.semilla)
+    print(f"Datos guardados en '{args.salida}' ({total} filas)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='antro', description='Z-scores antropométricos con tablas LMS')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('puntuar', help='calcular z-scores de un archivo de controles')
+    p.add_argument('entrada', nargs='?', default='datosAntro.csv')
+    p.add_argument('-o', '--salida', default=None)
+    p.add_argument('--bloque', type=int, default=None, metavar='FILAS',
+                   help='procesar por bloques de FILAS filas y escribir la salida incrementalmente')
+    p.add_argument('--formato', choices=list(WRITERS), default=None,
+                   help='formato de salida (por defecto según la extensión de SALIDA)')
+    p.add_argument('--procesos', type=int, default=1, metavar='N',
+                   help='calcular z-scores en N procesos con las tablas LMS en memoria compartida')
+    p.add_argument('--incremental', action='store_true',
+                   help='puntuar solo filas nuevas o modificadas desde la corrida anterior')
+    p.add_argument('--estado', default=None, metavar='ARCHIVO',
+                   help='estado del modo incremental (por defecto SALIDA.estado.pkl)')
+    p.add_argument('--clave', default=None, metavar='COLUMNA',
+                   help='columna que identifica cada fila en el modo incremental (por defecto id_num o ID)')
+    p.add_argument('--perfil', '--profile', action='store_true',
+                   help='mostrar tiempo, filas y memoria por etapa y contadores de resultados NaN')
+    p.set_defaults(func=cmd_puntuar)
+
+    p = sub.add_parser('prevalencia', help='prevalencias por sexo y banda de edad sin guardar las filas puntuadas')
+    p.add_argument('entradas', nargs='*', default=[], metavar='ENTRADA')
+    p.add_argument('-o', '--salida', default=None)
+    p.add_argument('--formato', choices=list(WRITERS), default=None)
+    p.add_argument('--bloque', type=int, default=100_000, metavar='FILAS')
+    p.add_argument('--procesos', type=int, default=1, metavar='N',
+                   help='con varias entradas, procesar cada archivo en su propio proceso')
+    p.add_argument('--guardar', default=None, metavar='ARCHIVO',
+                   help='guardar el acumulador para combinarlo después con --sumar')
+    p.add_argument('--sumar', nargs='+', default=[], metavar='ARCHIVO',
+                   help='combinar acumuladores guardados con --guardar')
+    p.add_argument('--perfil', '--profile', action='store_true')
+    p.set_defaults(func=cmd_prevalencia)
+
+    p = sub.add_parser('conciliar', help='comparar z-scores de Python con WHO Anthro y MySQL (calculosMuestraRandom.csv)')
+    p.add_argument('entrada', nargs='?', default='calculosMuestraRandom.csv')
+    p.add_argument('-o', '--salida', default=None, help='tabla de sesgo, desvío, RMSE y rango por estrato')
+    p.add_argument('--formato', choices=list(WRITERS), default=None)
+    p.add_argument('--correlaciones', default=None, metavar='ARCHIVO',
+                   help='correlaciones y p-valores de todos los pares y estratos')
+    p.add_argument('--bloque', type=int, default=250_000, metavar='FILAS')
+    p.add_argument('--bootstrap', type=int, default=0, metavar='REPLICAS',
+                   help='intervalos de confianza bootstrap de sesgo, RMSE, límites de concordancia y r')
+    p.add_argument('--nivel', type=float, default=0.95)
+    p.add_argument('--semilla', type=int, default=0)
+    p.add_argument('--estrato', choices=['Todos', 'F', 'M'], default='Todos')
+    p.add_argument('--procesos', type=int, default=1, metavar='N', help='repartir las réplicas en N procesos')
+    p.add_argument('--ic', default=None, metavar='ARCHIVO', help='exportar los intervalos bootstrap')
+    p.add_argument('--perfil', '--profile', action='store_true')
+    p.set_defaults(func=cmd_conciliar)
+
+    p = sub.add_parser('bd', help='puntuar una tabla SQLite con el esquema de datos_generados y guardar los resultados')
+    p.add_argument('base', help='archivo SQLite')
+    p.add_argument('--origen', default='datos_generados', help='tabla o consulta SELECT de origen')
+    p.add_argument('--destino', default='zscores_generados')
+    p.add_argument('--clave', default='ID')
+    p.add_argument('--lote', type=int, default=50_000, metavar='FILAS')
+    p.add_argument('--upsert', action='store_true', help='actualizar las claves que ya están en el destino')
+    p.add_argument('--procesos', type=int, default=1, metavar='N')
+    p.add_argument('--perfil', '--profile', action='store_true')
+    p.set_defaults(func=cmd_bd)
+
+    p = sub.add_parser('servir', help='servicio HTTP local que puntúa controles en micro-lotes')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--puerto', type=int, default=8080)
+    p.add_argument('--ventana-ms', type=float, default=2.0, metavar='MS',
+                   help='espera máxima para juntar controles sueltos en un lote')
+    p.add_argument('--lote-max', type=int, default=512, metavar='CONTROLES')
+    p.set_defaults(func=cmd_servir)
+
+    p = sub.add_parser('generar', help='generar controles sintéticos con el esquema de datos_generados.csv')
+    p.add_argument('-n', '--filas', type=int, default=400)
+    p.add_argument('-o', '--salida', default='datos_generados.csv')
+    p.add_argument('--bloque', type=int, default=1_000_000, metavar='FILAS')
+    p.add_argument('--semilla', type=int, default=None)
+    p.set_defaults(func=cmd_generar)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.comando == 'puntuar':
+        if args.salida is None:
+            args.salida = 'z_scores_resultados.csv' if args.bloque else 'z_scores_resultados.xlsx'
+        try:
+            output_format(args.salida, args.formato)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.bloque and args.incremental:
+            parser.error('--incremental no se combina con --bloque')
+    elif args.comando == 'conciliar':
+        for path, formato in [(args.salida, args.formato), (args.correlaciones, None), (args.ic, None)]:
+            if path is not None:
+                try:
+                    output_format(path, formato)
+                except ValueError as e:
+                    parser.error(str(e))
+    elif args.comando == 'prevalencia':
+        if not args.entradas and not args.sumar:
+            parser.error('indique al menos una ENTRADA o un acumulador con --sumar')
+        if args.salida is not None:
+            try:
+                output_format(args.salida, args.formato)
+            except ValueError as e:
+                parser.error(str(e))
+
+    # --perfil: tiempo, filas y memoria por etapa del comando
+    if getattr(args, 'perfil', False):
+        with profiling(Profiler()) as prof:
+            args.func(args)
+        print('\n' + prof.report())
+    else:
+        args.func(args)
@@ -0,0 +1,204 @@
+import contextlib
+import itertools
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .parallel import parallel_scorer
+from .pipeline import coerce_controls, score_controls
+from .profiling import get_profiler
+
+# Columnas que se escriben por cada control puntuado, con el nombre de
+# calcula_generados.sql y su tipo SQL; la clave se agrega adelante
+OUTPUT_COLUMNS = [
+    ('PesoEdad', 'PesoEdad_Z', 'DOUBLE'),
+    ('TallaEdad', 'TallaEdad_Z', 'DOUBLE'),
+    ('IMCEdad', 'IMCEdad_Z', 'DOUBLE'),
+    ('Edad', 'Edad', 'VARCHAR(16)'),
+    ('DiasEdad', 'edad_dias', 'INTEGER'),
+    ('ClasificacionPeso', 'ClasificacionPeso_calculada', 'VARCHAR(8)'),
+    ('ClasificacionTalla', 'ClasificacionTalla_calculada', 'VARCHAR(8)'),
+]
+
+
+# Pool de conexiones DB-API: `factory()` abre una conexión nueva; se mantienen hasta
+# `size` abiertas y se reutilizan. Sirve con cualquier driver (sqlite3, pymysql,
+# MySQLdb, psycopg)
+class ConnectionPool:
+    def __init__(self, factory, size=4):
+        self.factory = factory
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._open = 0
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._open < self.size
+                if create:
+                    self._open += 1
+            conn = self.factory() if create else self._idle.get()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._open = 0
+
+
+# Módulo del driver de una conexión ('sqlite3', 'pymysql', 'MySQLdb', 'psycopg', ...)
+def _driver(conn):
+    return sys.modules[type(conn).__module__.split('.')[0]]
+
+
+def _placeholders(conn, k):
+    style = getattr(_driver(conn), 'paramstyle', 'qmark')
+    if style == 'qmark':
+        return ', '.join(['?'] * k)
+    if style == 'numeric':
+        return ', '.join(f':{i + 1}' for i in range(k))
+    return ', '.join(['%s'] * k)
+
+
+# Cursor que trae las filas del servidor a medida que se piden (SSCursor en
+# pymysql/MySQLdb, cursor con nombre en psycopg); sqlite3 ya lee por pasos
+def stream_cursor(conn):
+    driver = _driver(conn)
+    cursors = getattr(driver, 'cursors', None)
+    if cursors is not None and hasattr(cursors, 'SSCursor'):
+        return conn.cursor(cursors.SSCursor)
+    if driver.__name__.startswith('psycopg'):
+        return conn.cursor(name='antro_stream')
+    return conn.cursor()
+
+
+# Leer el resultado de `query` en DataFrames de hasta `batch_size` filas
+def read_batches(conn, query, batch_size=50_000, params=()):
+    prof = get_profiler()
+    cursor = stream_cursor(conn)
+    try:
+        cursor.execute(query, params)
+        columns = [d[0] for d in cursor.description]
+        while True:
+            with prof.stage('leer_bd') as stage:
+                rows = cursor.fetchmany(batch_size)
+                stage['filas'] = len(rows)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        cursor.close()
+
+
+def create_results_table(conn, table, key='ID'):
+    columns = ', '.join(f'{name} {sql_type}' for name, _, sql_type in OUTPUT_COLUMNS)
+    cursor = conn.cursor()
+    cursor.execute(f'CREATE TABLE IF NOT EXISTS {table} ({key} VARCHAR(32) PRIMARY KEY, {columns})')
+    cursor.close()
+    conn.commit()
+
+
+# Sentencia INSERT (o upsert por la clave primaria) para la tabla de resultados
+def insert_statement(conn, table, columns, key, upsert=False):
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({_placeholders(conn, len(columns))})"
+    if not upsert:
+        return sql
+    name = _driver(conn).__name__
+    others = [c for c in columns if c != key]
+    if name in ('pymysql', 'MySQLdb', 'mysql'):
+        return sql + ' ON DUPLICATE KEY UPDATE ' + ', '.join(f'{c} = VALUES({c})' for c in others)
+    if name in ('sqlite3', 'psycopg', 'psycopg2'):
+        return sql + f' ON CONFLICT ({key}) DO UPDATE SET ' + ', '.join(f'{c} = excluded.{c}' for c in others)
+    raise ValueError(f"No se conoce la sintaxis de upsert para el driver {name}")
+
+
+# Filas de un DataFrame como tuplas para executemany (NaN y categorías a None)
+def _records(df):
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+# Puntuar y clasificar los controles de `source` (tabla con el esquema de
+# datos_generados o consulta SELECT) y escribir los resultados en `target` por la
+# clave `key`. Lee con un cursor de servidor en lotes de `batch_size`, escribe con
+# executemany y confirma cada `commit_every` lotes. Con upsert=True actualiza las
+# claves que ya existen. Usa dos conexiones del pool a la vez (la que lee queda
+# ocupada por el cursor mientras la otra escribe), así que el pool debe admitir al
+# menos dos. Devuelve filas/s de lectura y de escritura por separado
+def score_table(pool, source, target, key='ID', batch_size=50_000, commit_every=4, upsert=False,
+                workers=1, log=print):
+    if pool.size < 2:
+        raise ValueError(f"score_table necesita un pool de al menos 2 conexiones (tiene {pool.size})")
+    query = source if source.lstrip().lower().startswith('select') else f'SELECT * FROM {source}'
+    columns = [key] + [name for name, _, _ in OUTPUT_COLUMNS]
+    prof = get_profiler()
+    total = 0
+    read_s = write_s = 0.0
+    t0 = time.perf_counter()
+    with pool.connection() as reader, pool.connection() as writer, parallel_scorer(workers) as scorer, \
+            contextlib.closing(read_batches(reader, query, batch_size)) as batches:
+        create_results_table(writer, target, key)
+        sql = insert_statement(writer, target, columns, key, upsert)
+        cursor = writer.cursor()
+        for i in itertools.count():
+            t = time.perf_counter()
+            batch = next(batches, None)
+            read_s += time.perf_counter() - t
+            if batch is None:
+                break
+
+            batch['Sexo'] = batch['Sexo'].astype(str).str[:1]  # 'Femenino'/'Masculino' o 'F'/'M'
+            scored = score_controls(coerce_controls(batch), workers=workers, scorer=scorer)
+            out = pd.DataFrame({key: batch[key].astype(str)})
+            for name, col, _ in OUTPUT_COLUMNS:
+                out[name] = scored[col]
+            out['DiasEdad'] = out['DiasEdad'].astype('Int64')
+
+            t = time.perf_counter()
+            with prof.stage('escribir_bd', len(out)):
+                cursor.executemany(sql, _records(out))
+                if (i + 1) % commit_every == 0:
+                    writer.commit()
+            write_s += time.perf_counter() - t
+            total += len(out)
+            if log is not None:
+                log(f"{total} filas ({total / (time.perf_counter() - t0):.0f} filas/s)")
+        t = time.perf_counter()
+        writer.commit()
+        cursor.close()
+        write_s += time.perf_counter() - t
+    return {'filas': total, 'segundos': time.perf_counter() - t0,
+            'lectura_filas_s': total / read_s if read_s else np.nan,
+            'escritura_filas_s': total / write_s if write_s else np.nan}
+
+
+# Pool sobre una base SQLite, reemplazo local de MySQL. En modo WAL la conexión que
+# lee y la que escribe no se bloquean; ':memory:' se abre como base en memoria
+# compartida para que todas las conexiones del pool vean las mismas tablas
+def sqlite_pool(path, size=2):
+    import sqlite3
+
+    def factory():
+        if path == ':memory:':
+            return sqlite3.connect('file:antro?mode=memory&cache=shared', uri=True, check_same_thread=False)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    return ConnectionPool(factory, size)
@@ -0,0 +1,94 @@
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+
+from .lms import LMS_INDICATORS, get_lms_grid
+from .zscore import calculate_measurements
+
+# Listas de nombres aleatorios en español
+NOMBRES_MASCULINOS = [
+    'Juan', 'Carlos', 'Miguel', 'José', 'Antonio', 'Francisco', 'Manuel', 'David', 'Javier', 'Daniel',
+    'Pedro', 'Luis', 'Diego', 'Alejandro', 'Fernando', 'Raúl', 'Sergio', 'Pablo', 'Angel', 'Roberto',
+    'Enrique', 'Gustavo', 'Mario', 'Kevin', 'Leonardo', 'Esteban', 'Roque', 'Jonathan', 'Armando', 'Joel',
+    'Hector', 'Joaquin', 'Roque', 'Fernando', 'Jorge'
+]
+NOMBRES_FEMENINOS = [
+    'María', 'Ana', 'Carmen', 'Laura', 'Sofía', 'Isabel', 'Pilar', 'Cristina', 'Elena',
+    'Marta', 'Sara', 'Paula', 'Clara', 'Beatriz', 'Rosa', 'Teresa', 'Julia', 'Nuria', 'Alba',
+    'Rosa', 'Gabriela', 'Estela', 'Yesica', 'Angeles', 'Margarita', 'Estela', 'Luisa', 'Patricia', 'Estela',
+    'Fernanda', 'Angeles', 'Florencia', 'Montserrat', 'Paz', 'Graciela', 'Paola', 'Sandra'
+]
+
+ID_CHARS = np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', dtype=np.uint8)
+COLUMNS = ['ID', 'Nombre', 'Fecha_Nacimiento', 'Fecha_Control', 'Peso_Kg', 'Talla_cm', 'Sexo']
+
+# Fecha de control y rango de edades: 1 día a 18 años al 30/09/2025
+FECHA_REFERENCIA = datetime.date(2025, 9, 30)
+EDAD_MIN_DIAS = 1
+EDAD_MAX_DIAS = int(365.25 * 18)
+EDAD_MAX_PESO = 3650  # Peso/Edad hasta 10 años; después peso a partir de IMC/Edad y talla
+
+# Edades generables: días con L, M y S definidos para Talla/Edad y para Peso/Edad o
+# IMC/Edad según la edad (las tablas mensuales empiezan a los 61 meses y dejan
+# sin valores los días 1826 a 1856)
+def valid_ages():
+    grid = get_lms_grid()
+    ages = np.arange(EDAD_MIN_DIAS, EDAD_MAX_DIAS + 1)
+    M = {indicator: grid[i, :, 1][:, ages] for i, indicator in enumerate(LMS_INDICATORS)}  # (sexo, edad)
+    peso = np.where(ages <= EDAD_MAX_PESO, M['tablaPE'], M['tablaIMC'])
+    ok = ~np.isnan(M['tablaTE']).any(axis=0) & ~np.isnan(peso).any(axis=0)
+    return ages[ok]
+
+
+# Generar n controles sintéticos con el esquema de datos_generados.csv
+def generate_controls(n, ages, rng):
+    edad = rng.choice(ages, n)
+    sexo = rng.choice(np.array(['m', 'f']), n)
+    masc = sexo == 'm'
+
+    ids = ID_CHARS[rng.integers(0, len(ID_CHARS), (n, 7))].view('S7').ravel().astype('U7')
+    nombres = np.where(masc, rng.choice(NOMBRES_MASCULINOS, n), rng.choice(NOMBRES_FEMENINOS, n))
+
+    # Fechas de nacimiento: cada edad distinta se formatea una sola vez
+    edades_unicas, inv = np.unique(edad, return_inverse=True)
+    nacimientos = (np.datetime64(FECHA_REFERENCIA) - edades_unicas.astype('timedelta64[D]'))
+    fechas = pd.DatetimeIndex(nacimientos).strftime('%d/%m/%Y').to_numpy()[inv]
+
+    z_talla = np.round(rng.uniform(-4, 4, n), 1)
+    talla = np.round(calculate_measurements('tablaTE', edad, sexo, z_talla), 1)
+
+    # Hasta 10 años el z es de Peso/Edad; después de IMC/Edad
+    z_peso = np.round(rng.uniform(-4, 4, n), 1)
+    hasta_10 = edad <= EDAD_MAX_PESO
+    peso = np.empty(n)
+    peso[hasta_10] = calculate_measurements('tablaPE', edad[hasta_10], sexo[hasta_10], z_peso[hasta_10])
+    imc = calculate_measurements('tablaIMC', edad[~hasta_10], sexo[~hasta_10], z_peso[~hasta_10])
+    peso[~hasta_10] = imc * (talla[~hasta_10] / 100) ** 2
+
+    return pd.DataFrame({
+        'ID': ids,
+        'Nombre': nombres,
+        'Fecha_Nacimiento': fechas,
+        'Fecha_Control': FECHA_REFERENCIA.strftime('%d/%m/%Y'),
+        'Peso_Kg': np.round(peso, 1),
+        'Talla_cm': talla,
+        'Sexo': np.char.upper(sexo),
+    }, columns=COLUMNS)
+
+
+# Escribir n controles sintéticos en bloques de chunk_size filas
+def write_generated(path, n, chunk_size=1_000_000, seed=None, log=print):
+    ages = valid_ages()
+    rng = np.random.default_rng(seed)
+    t0 = time.perf_counter()
+    written = 0
+    while written < n:
+        df = generate_controls(min(chunk_size, n - written), ages, rng)
+        df.to_csv(path, sep=';', index=False, mode='w' if written == 0 else 'a', header=written == 0,
+                  encoding='utf-8')
+        written += len(df)
+        if log is not None:
+            log(f"{written} filas generadas ({written / (time.perf_counter() - t0):.0f} filas/s)")
+    return written
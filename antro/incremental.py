@@ -0,0 +1,131 @@
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .lms import lms_tables_fingerprint
+from .pipeline import CSV_OPTIONS, coerce_controls, score_controls
+from .profiling import get_profiler
+from .writers import CSVWriter, output_format, write_dataframe
+from .zscore import ZSCORE_VERSION
+
+STATE_VERSION = 2
+# Columnas que se usan como clave si no se indica una: id_num en datosAntro.csv, ID en
+# datos_generados.csv
+KEY_COLUMNS = ['id_num', 'ID']
+
+
+# Huella de contenido por fila (hash de todas las columnas de entrada, leídas como texto)
+def row_fingerprints(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+# Clave de cada fila: id más el número de aparición, por si un id se repite. Con la
+# entrada leída como texto un id vacío es '' y se numera como cualquier otro
+def row_keys(df, key):
+    ids = df[key].astype(str)
+    return (ids + '#' + df.groupby(key, sort=False, dropna=False).cumcount().astype(str)).to_numpy()
+
+
+# Columna clave: `key` si se indica, si no la primera de KEY_COLUMNS que exista
+def key_column(df, key=None):
+    candidates = [key] if key else KEY_COLUMNS
+    for col in candidates:
+        if col in df.columns:
+            return col
+    raise ValueError(f"La entrada no tiene la columna clave {' ni '.join(candidates)}")
+
+
+def load_state(path):
+    try:
+        return pd.read_pickle(path)
+    except FileNotFoundError:
+        return None
+
+
+def save_state(path, state):
+    tmp = path + '.tmp'
+    pd.to_pickle(state, tmp)
+    os.replace(tmp, path)
+
+
+# Leer la entrada como texto, sin inferir tipos ni valores faltantes: así la clave y
+# la huella de una fila no cambian porque otra fila tenga un id vacío o un Peso no
+# numérico (pandas pasaría toda la columna a float u object)
+def read_text(path):
+    return pd.read_csv(path, dtype=str, keep_default_na=False, **CSV_OPTIONS)
+
+
+# Tipos de las filas que se van a puntuar, inferidos como en la lectura normal del
+# archivo (read_csv con CSV_OPTIONS) pero solo sobre esas filas
+def parse_rows(text):
+    buffer = io.StringIO()
+    text.to_csv(buffer, index=False, sep=CSV_OPTIONS['sep'])
+    buffer.seek(0)
+    options = {k: v for k, v in CSV_OPTIONS.items() if k != 'encoding'}
+    return pd.read_csv(buffer, **options)
+
+
+# Exportar resultados según la extensión de salida o `formato`
+def write_results(df, salida, formato=None):
+    with get_profiler().stage('exportar', len(df)):
+        write_dataframe(df, salida, formato)
+
+
+# Puntuar solo las filas nuevas o modificadas respecto de la corrida anterior. El
+# estado guarda los resultados con la huella de cada fila; si cambian las tablas
+# LMS, la versión del cálculo o las columnas de entrada, se recalcula todo. Claves y
+# huellas salen de la entrada como texto; los tipos se infieren solo para las filas
+# que se puntúan
+def score_incremental(entrada, salida, estado=None, key=None, workers=1, formato=None, log=print):
+    estado = estado or salida + '.estado.pkl'
+    t0 = time.perf_counter()
+    with get_profiler().stage('leer_csv') as stage:
+        raw = read_text(entrada)
+        stage['filas'] = len(raw)
+    keys = row_keys(raw, key_column(raw, key))
+    fingerprints = row_fingerprints(raw)
+    context = {'version': STATE_VERSION, 'zscore': ZSCORE_VERSION, 'lms': lms_tables_fingerprint(), 'columnas': list(raw.columns)}
+
+    state = load_state(estado)
+    reuse = np.zeros(len(raw), dtype=bool)
+    if state is not None and state['contexto'] == context:
+        previous = state['resultados']
+        pos = previous.index.get_indexer(keys)
+        found = pos >= 0
+        reuse[found] = previous['_huella'].to_numpy()[pos[found]] == fingerprints[found]
+        removed = len(previous) - int(found.sum())
+    else:
+        previous = None
+        removed = 0
+
+    scored = score_controls(coerce_controls(parse_rows(raw[~reuse])), workers=workers)
+    scored.index = np.flatnonzero(~reuse)
+    if reuse.any():
+        kept = previous.iloc[pos[reuse]].drop(columns='_huella')
+        kept.index = np.flatnonzero(reuse)
+        result = pd.concat([kept, scored]).sort_index()
+    else:
+        result = scored
+
+    result.index = pd.Index(keys, name='_clave')
+    result['_huella'] = fingerprints
+    save_state(estado, {'contexto': context, 'resultados': result})
+
+    # Si solo se agregaron filas al final, a un CSV basta con agregarles las nuevas
+    appended_only = (previous is not None and removed == 0 and output_format(salida, formato) == 'csv' and os.path.exists(salida)
+                     and reuse[:len(previous)].all() and np.array_equal(pos[:len(previous)], np.arange(len(previous))))
+    if appended_only:
+        with get_profiler().stage('exportar', len(scored)):
+            with CSVWriter(salida, append=True) as writer:
+                writer.write(scored)
+    else:
+        write_results(result.drop(columns='_huella'), salida, formato)
+
+    summary = {'filas': len(raw), 'puntuadas': int((~reuse).sum()), 'reutilizadas': int(reuse.sum()),
+               'eliminadas': removed, 'recalculo_completo': previous is None}
+    if log is not None:
+        log(f"{summary} en {time.perf_counter() - t0:.2f} s")
+    return summary
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from .profiling import get_profiler
+
+# Directorio de las tablas tablaPE/TE/IMC (x y 6x); por defecto la raíz del repositorio
+TABLES_DIR = os.environ.get('ANTRO_TABLAS', os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tabla LMS compilada: L, M y S por indicador y sexo en una grilla diaria de 0 a 6935 días
+LMS_INDICATORS = ['tablaPE', 'tablaTE', 'tablaIMC']
+LMS_SEXES = ['m', 'f']
+LMS_SOURCES = ['tablaPEx', 'tablaTEx', 'tablaIMCx', 'tablaPE6x', 'tablaTE6x', 'tablaIMC6x']
+LMS_MAX_DAYS = 6935
+LMS_GRID_FILE = os.path.join(TABLES_DIR, 'tablas_lms.npy')
+LMS_MANIFEST_FILE = os.path.join(TABLES_DIR, 'tablas_lms.json')
+LMS_GRID_VERSION = 1
+
+# Cargar y estandarizar tablas LMS
+def load_lms_tables():
+    tables = {}
+    for table_name in LMS_SOURCES:
+        df = pd.read_csv(os.path.join(TABLES_DIR, table_name + '.csv'))  # Asume que los archivos son e.g., tablaPEx.csv
+        # Convertir columnas numéricas a numérico
+        numeric_cols = [col for col in df.columns if col not in ['idIMC']]  # Asume idIMC es string, ajusta si necesario
+        for col in numeric_cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        tables[table_name] = df
+    return tables
+
+# Tablas LMS como arreglos ordenados por edad, para interpolar lotes completos
+def build_lms_arrays(tables):
+    arrays = {}
+    for table_name, df in tables.items():
+        age_col = 'age_s' if table_name.endswith('6x') else 'age'
+        df = df.sort_values(age_col)  # tablaTEx no viene ordenada
+        arrays[table_name] = {
+            'age': df[age_col].to_numpy(dtype=float),
+            'm': (df['lo'].to_numpy(dtype=float), df['mo'].to_numpy(dtype=float), df['so'].to_numpy(dtype=float)),
+            'f': (df['la'].to_numpy(dtype=float), df['ma'].to_numpy(dtype=float), df['sa'].to_numpy(dtype=float)),
+        }
+    return arrays
+
+# Interpolar L, M y S desde las tablas fuente (diaria hasta 1825 días, mensual después)
+def interpolate_lms_arrays(arrays, indicator, age_days, sexo):
+    age_days = np.asarray(age_days, dtype=float)
+    sexo = np.asarray(sexo)
+    L = np.full(age_days.shape, np.nan)
+    M = np.full(age_days.shape, np.nan)
+    S = np.full(age_days.shape, np.nan)
+    diaria = age_days <= 1825  # Diaria
+    mensual = age_days > 1825
+    for sex in LMS_SEXES:
+        es_sexo = sexo == sex
+        for mask, table_name, ages in [(diaria & es_sexo, indicator + 'x', age_days),
+                                       (mensual & es_sexo, indicator + '6x', age_days / 30.4375)]:
+            if not mask.any():
+                continue
+            t = arrays[table_name]
+            x = ages[mask]
+            for out, col in zip((L, M, S), t[sex]):
+                out[mask] = np.interp(x, t['age'], col, left=np.nan, right=np.nan)
+    return L, M, S
+
+# Huella de un CSV fuente: tamaño, fecha de modificación y sha256 del contenido
+def lms_source_fingerprint(table_name, with_hash=True):
+    path = os.path.join(TABLES_DIR, table_name + '.csv')
+    st = os.stat(path)
+    fingerprint = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    if with_hash:
+        with open(path, 'rb') as f:
+            fingerprint['sha256'] = hashlib.sha256(f.read()).hexdigest()
+    return fingerprint
+
+# Escribir un archivo de forma atómica: `write(f)` escribe en un temporal con nombre
+# único por proceso en el mismo directorio y os.replace lo pone en su lugar. Si
+# varios procesos compilan a la vez cada uno escribe su propio temporal, y quien ya
+# mapeó la grilla anterior sigue leyendo ese archivo
+def _write_atomic(path, write, mode='wb'):
+    tmp = f'{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp'
+    try:
+        with open(tmp, mode.replace('w', 'x')) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+# Compilar las seis tablas CSV a la grilla binaria (escritura atómica)
+def compile_lms_grid(grid_file=LMS_GRID_FILE, manifest_file=LMS_MANIFEST_FILE):
+    arrays = build_lms_arrays(load_lms_tables())
+    ages = np.arange(LMS_MAX_DAYS + 1, dtype=float)
+    grid = np.empty((len(LMS_INDICATORS), len(LMS_SEXES), 3, len(ages)))
+    for i, indicator in enumerate(LMS_INDICATORS):
+        for s, sex in enumerate(LMS_SEXES):
+            grid[i, s] = interpolate_lms_arrays(arrays, indicator, ages, np.full(ages.shape, sex))
+    manifest = {
+        'version': LMS_GRID_VERSION,
+        'shape': list(grid.shape),
+        'sources': {name: lms_source_fingerprint(name) for name in LMS_SOURCES},
+    }
+    # La grilla primero: un manifiesto al día implica una grilla al día
+    _write_atomic(grid_file, lambda f: np.save(f, grid))
+    _write_atomic(manifest_file, lambda f: json.dump(manifest, f, indent=2), 'w')
+    return manifest
+
+# Verificar que la grilla compilada corresponde a los CSV actuales
+def lms_grid_is_current(grid_file=LMS_GRID_FILE, manifest_file=LMS_MANIFEST_FILE):
+    try:
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if manifest.get('version') != LMS_GRID_VERSION or not os.path.exists(grid_file):
+        return False
+    sources = manifest.get('sources', {})
+    touched = False
+    for name in LMS_SOURCES:
+        stored = sources.get(name)
+        if stored is None:
+            return False
+        current = lms_source_fingerprint(name, with_hash=False)
+        if current['size'] == stored['size'] and current['mtime_ns'] == stored['mtime_ns']:
+            continue
+        # La fecha cambió: solo es obsoleta si cambió el contenido
+        if current['size'] != stored['size']:
+            return False
+        current = lms_source_fingerprint(name)
+        if current['sha256'] != stored['sha256']:
+            return False
+        sources[name] = current
+        touched = True
+    # Mismo contenido con otra fecha: anotar la fecha nueva para no volver a calcular
+    # el hash en cada arranque (si no se puede escribir, la grilla sigue siendo válida)
+    if touched:
+        try:
+            _write_atomic(manifest_file, lambda f: json.dump(manifest, f, indent=2), 'w')
+        except OSError:
+            pass
+    return True
+
+# Cargar la grilla en memoria mapeada de solo lectura, recompilando si los CSV cambiaron
+def load_lms_grid(grid_file=LMS_GRID_FILE, manifest_file=LMS_MANIFEST_FILE):
+    if not lms_grid_is_current(grid_file, manifest_file):
+        compile_lms_grid(grid_file, manifest_file)
+    return np.load(grid_file, mmap_mode='r')
+
+# Grilla cargada de forma diferida en el primer uso
+_lms_grid = None
+
+def get_lms_grid():
+    global _lms_grid
+    if _lms_grid is None:
+        with get_profiler().stage('tablas'):
+            _lms_grid = load_lms_grid()
+    return _lms_grid
+
+# Reemplazar la grilla en uso (p. ej. por una vista sobre memoria compartida)
+def set_lms_grid(grid):
+    global _lms_grid
+    _lms_grid = grid
+
+# Huella de las tablas LMS en uso (sha256 de los seis CSV fuente); cambia cuando
+# cambia el contenido de alguna tabla
+def lms_tables_fingerprint(manifest_file=LMS_MANIFEST_FILE):
+    get_lms_grid()  # recompila la grilla y el manifiesto si los CSV cambiaron
+    with open(manifest_file) as f:
+        sources = json.load(f)['sources']
+    digest = hashlib.sha256(str(LMS_GRID_VERSION).encode())
+    for name in LMS_SOURCES:
+        digest.update(sources[name]['sha256'].encode())
+    return digest.hexdigest()
+
+# L, M y S para arreglos de edades y sexos, leídos de la grilla compilada
+def get_interpolated_lms_batch(indicator, age_days, sexo):
+    age_days = np.asarray(age_days, dtype=float)
+    sexo = np.asarray(sexo)
+    L = np.full(age_days.shape, np.nan)
+    M = np.full(age_days.shape, np.nan)
+    S = np.full(age_days.shape, np.nan)
+    grid = get_lms_grid()[LMS_INDICATORS.index(indicator)]
+    in_range = (age_days >= 0) & (age_days <= LMS_MAX_DAYS)
+    whole = age_days == np.floor(age_days)
+    for s, sex in enumerate(LMS_SEXES):
+        es_sexo = in_range & (sexo == sex)
+        # Edades enteras: acceso directo por índice; fraccionarias: interpolación lineal en la grilla
+        exact = es_sexo & whole
+        frac = es_sexo & ~whole
+        idx = age_days[exact].astype(np.intp)
+        for k, out in enumerate((L, M, S)):
+            out[exact] = grid[s, k, idx]
+            if frac.any():
+                out[frac] = np.interp(age_days[frac], np.arange(grid.shape[-1]), grid[s, k])
+    return L, M, S
+
+# Función para interpolar LMS basado en edad y sexo
+def get_interpolated_lms(indicator, age_days, sexo):
+    L, M, S = get_interpolated_lms_batch(indicator, [age_days], [sexo])
+    return L[0], M[0], S[0]
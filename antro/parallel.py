@@ -0,0 +1,87 @@
+import contextlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import lms
+from .zscore import calculate_zscores_batch
+
+# Por debajo de estas filas por proceso repartir cuesta más que calcular
+MIN_PART_ROWS = 10_000
+
+# Bloque de memoria compartida con la grilla LMS, adjuntado una vez por proceso
+_shm = None
+
+
+# Inicializador de cada proceso: adjuntar la grilla compartida sin copiarla
+def _attach_lms_grid(name, shape, dtype):
+    global _shm
+    _shm = shared_memory.SharedMemory(name=name)
+    lms.set_lms_grid(np.ndarray(shape, dtype=dtype, buffer=_shm.buf))
+
+
+def _score_part(part):
+    return calculate_zscores_batch(*part)
+
+
+# Procesos de cálculo con la grilla LMS en memoria compartida. La grilla se copia y
+# los procesos se lanzan una sola vez (al primer bloque que los necesita) y se
+# reutilizan en todos los bloques de una corrida; se liberan con close() o al salir
+# del `with`
+class ParallelScorer:
+    def __init__(self, workers=None, min_part_rows=MIN_PART_ROWS):
+        self.workers = workers or os.cpu_count()
+        self.min_part_rows = min_part_rows
+        self._shm = None
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start(self):
+        grid = lms.get_lms_grid()
+        self._shm = shared_memory.SharedMemory(create=True, size=grid.nbytes)
+        np.ndarray(grid.shape, dtype=grid.dtype, buffer=self._shm.buf)[...] = grid
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_attach_lms_grid,
+                                         initargs=(self._shm.name, grid.shape, grid.dtype.str))
+
+    # Z-scores de un bloque: se divide en una parte por proceso (o en partes de
+    # `chunk_size` filas) y se reensambla en el orden de entrada
+    def zscores(self, age_days, sexo, peso, talla, chunk_size=None):
+        columns = [np.asarray(age_days, dtype=float), np.asarray(sexo), np.asarray(peso, dtype=float), np.asarray(talla, dtype=float)]
+        n = len(columns[0])
+        chunk_size = chunk_size or max(-(-n // self.workers), self.min_part_rows)
+        if self.workers <= 1 or n <= chunk_size:
+            return calculate_zscores_batch(*columns)
+        if self._pool is None:
+            self._start()
+        parts = [[col[i:i + chunk_size] for col in columns] for i in range(0, n, chunk_size)]
+        results = list(self._pool.map(_score_part, parts))
+        return {col: np.concatenate([r[col] for r in results]) for col in results[0]}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+# ParallelScorer para una corrida por bloques, o nada si se calcula en un proceso
+def parallel_scorer(workers):
+    return ParallelScorer(workers) if workers > 1 else contextlib.nullcontext()
+
+
+# Z-scores en paralelo de una sola entrada: la divide en una parte por proceso (o en
+# partes de `chunk_size` filas), las puntúa en `workers` procesos que comparten la
+# grilla LMS y reensambla en el orden de entrada
+def calculate_zscores_parallel(age_days, sexo, peso, talla, workers=None, chunk_size=None):
+    with ParallelScorer(workers) as scorer:
+        return scorer.zscores(age_days, sexo, peso, talla, chunk_size)
@@ -0,0 +1,129 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from .age import calculate_age_days, format_age
+from .classification import classify_height, classify_weight
+from .parallel import calculate_zscores_parallel, parallel_scorer
+from .profiling import get_profiler
+from .writers import open_writer
+from .zscore import calculate_zscores_batch
+
+# Formato de los archivos de controles (datosAntro.csv)
+CSV_OPTIONS = {'sep': ';', 'decimal': ',', 'encoding': 'latin-1'}
+
+
+# Columnas de datos_generados.csv con su nombre en datosAntro.csv
+GENERATED_COLUMNS = {'Fecha_Nacimiento': 'FechaNacimiento', 'Fecha_Control': 'FechaControl', 'Peso_Kg': 'Peso', 'Talla_cm': 'Talla'}
+# Columnas de entrada que se convierten a número (las fechas no son numéricas)
+NUMERIC_COLUMNS = ['Peso', 'Talla', 'Age (d)', 'IMCEdad']
+
+
+# Convertir columnas numéricas de un DataFrame de controles
+def coerce_controls(df_data):
+    with get_profiler().stage('convertir', len(df_data)):
+        df_data = df_data.rename(columns=GENERATED_COLUMNS)
+        for col in NUMERIC_COLUMNS:
+            if col in df_data.columns:
+                df_data[col] = pd.to_numeric(df_data[col], errors='coerce')
+    return df_data
+
+
+# Cargar el archivo de datos y estandarizar
+def read_controls(path):
+    with get_profiler().stage('leer_csv') as stage:
+        df_data = pd.read_csv(path, **CSV_OPTIONS)
+        stage['filas'] = len(df_data)
+    return coerce_controls(df_data)
+
+
+# Agregar edad, IMC y z-scores a un DataFrame de controles; con workers > 1 los
+# z-scores se calculan en paralelo (en los procesos de `scorer` si se pasa uno, para
+# reutilizarlos entre bloques)
+def score_controls(df_data, workers=1, scorer=None):
+    prof = get_profiler()
+    n = len(df_data)
+
+    # Calcular edad en días (NaN si las fechas son inválidas o futuras)
+    with prof.stage('edad', n):
+        df_data['edad_dias'] = calculate_age_days(df_data['FechaNacimiento'], df_data['FechaControl'])
+        df_data['Edad'] = format_age(df_data['edad_dias'])
+
+    # Calcular IMC
+    with prof.stage('imc', n):
+        df_data['IMC_calculado'] = df_data['Peso'] / (df_data['Talla'] / 100) ** 2
+
+    # Calcular z-scores
+    if scorer is not None:
+        with prof.stage('zscores_paralelo', n):
+            zscores = scorer.zscores(df_data['edad_dias'], df_data['Sexo'], df_data['Peso'], df_data['Talla'])
+    elif workers > 1:
+        with prof.stage('zscores_paralelo', n):
+            zscores = calculate_zscores_parallel(df_data['edad_dias'], df_data['Sexo'], df_data['Peso'], df_data['Talla'], workers=workers)
+    else:
+        zscores = calculate_zscores_batch(df_data['edad_dias'], df_data['Sexo'], df_data['Peso'], df_data['Talla'])
+    for col, z in zscores.items():
+        df_data[col] = z
+
+    # Clasificar como calcula_generados.sql
+    with prof.stage('clasificacion', n):
+        df_data['ClasificacionPeso_calculada'] = classify_weight(zscores['PesoEdad_Z'], zscores['IMCEdad_Z'], df_data['edad_dias'])
+        df_data['ClasificacionTalla_calculada'] = classify_height(zscores['TallaEdad_Z'])
+
+    if prof.enabled:
+        count_outcomes(prof, df_data, zscores)
+    return df_data
+
+
+# Contadores de filas que terminan en NaN o fuera de rango, por causa
+def count_outcomes(prof, df_data, zscores):
+    edad = df_data['edad_dias'].to_numpy(dtype=float)
+    sexo = df_data['Sexo'].astype(str).str.lower()
+    prof.count('filas', len(df_data))
+    prof.count('sexo_desconocido', (~sexo.isin(['m', 'f'])).sum())
+    prof.count('fecha_invalida_o_futura', np.isnan(edad).sum())
+    prof.count('peso_no_positivo', (df_data['Peso'] <= 0).sum())
+    prof.count('talla_no_positiva', (df_data['Talla'] <= 0).sum())
+    prof.count('edad_mayor_3650_sin_PE', (edad > 3650).sum())
+    prof.count('edad_mayor_6935_sin_TE_IMC', (edad > 6935).sum())
+    for col, z in zscores.items():
+        prof.count(col + '_nan', np.isnan(z).sum())
+
+
+# Tipos para leer un archivo por bloques: las columnas que no se convierten a número
+# se leen como texto. Si no, read_csv infiere tipos por bloque y una columna de texto
+# vacía en un bloque (p. ej. Nombre) llega como float ahí y como texto en los demás
+def text_dtypes(entrada):
+    columns = pd.read_csv(entrada, nrows=0, **CSV_OPTIONS).columns
+    return {col: str for col in columns if GENERATED_COLUMNS.get(col, col) not in NUMERIC_COLUMNS}
+
+
+# Procesar un archivo de controles por bloques de `chunk_size` filas, agregando cada
+# bloque puntuado a la salida (CSV, Parquet, Feather o Excel según la extensión o
+# `formato`); la memoria depende del bloque, no del archivo
+def score_file_chunked(entrada, salida, chunk_size=100_000, workers=1, formato=None, log=print):
+    total = 0
+    t0 = time.perf_counter()
+    prof = get_profiler()
+    reader = pd.read_csv(entrada, chunksize=chunk_size, dtype=text_dtypes(entrada), **CSV_OPTIONS)
+    writer = open_writer(salida, formato)
+    try:
+        with parallel_scorer(workers) as scorer:
+            while True:
+                with prof.stage('leer_csv') as stage:
+                    chunk = next(reader, None)
+                    stage['filas'] = 0 if chunk is None else len(chunk)
+                if chunk is None:
+                    break
+                chunk = score_controls(coerce_controls(chunk), workers=workers, scorer=scorer)
+                with prof.stage('exportar', len(chunk)):
+                    writer.write(chunk)
+                total += len(chunk)
+                if log is not None:
+                    elapsed = time.perf_counter() - t0
+                    log(f"{total} filas procesadas ({total / elapsed:.0f} filas/s)")
+    finally:
+        with prof.stage('exportar'):
+            writer.close()
+    return total
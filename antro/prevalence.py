@@ -0,0 +1,151 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .classification import HEIGHT_CATEGORIES, WEIGHT_CATEGORIES
+from .lms import LMS_SEXES
+from .parallel import parallel_scorer
+from .pipeline import CSV_OPTIONS, coerce_controls, score_controls
+from .profiling import get_profiler
+
+# Bandas de edad en meses cumplidos (días / 30.4375, como en calcula_generados.sql):
+# cada banda va desde su límite hasta el siguiente; la última hasta los 19 años
+AGE_BANDS = [(0, '0-5m'), (6, '6-11m'), (12, '12-23m'), (24, '24-59m'), (60, '5-9a'), (120, '10-18a')]
+AGE_BAND_END = 228
+ZSCORE_COLUMNS = ['PesoEdad_Z', 'TallaEdad_Z', 'IMCEdad_Z']
+CLASSIFICATIONS = [('Peso', 'ClasificacionPeso_calculada', WEIGHT_CATEGORIES),
+                   ('Talla', 'ClasificacionTalla_calculada', HEIGHT_CATEGORIES)]
+_BAND_EDGES = np.array([start for start, _ in AGE_BANDS] + [AGE_BAND_END], dtype=float)
+
+
+# Grupo (sexo × banda de edad) de cada fila; -1 si el sexo es desconocido o la edad
+# es NaN o está fuera de las bandas
+def group_codes(age_days, sexo):
+    months = np.floor(np.asarray(age_days, dtype=float) / 30.4375)
+    with np.errstate(invalid='ignore'):
+        band = np.searchsorted(_BAND_EDGES, months, side='right') - 1
+        band[~((months >= 0) & (months < AGE_BAND_END))] = -1
+    sex = pd.Categorical(pd.Series(sexo).astype(str).str.lower(), categories=LMS_SEXES).codes
+    return np.where((band >= 0) & (sex >= 0), sex * len(AGE_BANDS) + band, -1)
+
+
+# Acumulador de prevalencias por sexo y banda de edad: conteos por categoría de
+# ClasificacionPeso y ClasificacionTalla y n, media y suma de cuadrados de cada
+# z-score. Ocupa lo mismo sin importar cuántas filas reciba, y dos acumuladores
+# (de procesos o archivos distintos) se combinan con merge; la media y el desvío
+# se combinan con la fórmula de Chan et al., estable aun con n muy distintos
+class PrevalenceAccumulator:
+    def __init__(self):
+        groups = len(LMS_SEXES) * len(AGE_BANDS)
+        self.rows = 0
+        self.excluded = 0
+        # Una columna por categoría más una para filas sin clasificación
+        self.counts = {name: np.zeros((groups, len(cats) + 1), dtype=np.int64) for name, _, cats in CLASSIFICATIONS}
+        self.n = np.zeros((len(ZSCORE_COLUMNS), groups))
+        self.mean = np.zeros((len(ZSCORE_COLUMNS), groups))
+        self.m2 = np.zeros((len(ZSCORE_COLUMNS), groups))
+
+    # Agregar un bloque de controles puntuados (salida de score_controls)
+    def update(self, df):
+        groups = group_codes(df['edad_dias'], df['Sexo'])
+        ok = groups >= 0
+        g = groups[ok]
+        size = len(self.n[0])
+        self.rows += len(df)
+        self.excluded += int((~ok).sum())
+
+        for name, col, cats in CLASSIFICATIONS:
+            codes = pd.Categorical(df[col], categories=cats).codes[ok].astype(np.int64)
+            codes[codes < 0] = len(cats)
+            width = len(cats) + 1
+            self.counts[name] += np.bincount(g * width + codes, minlength=size * width).reshape(size, width)
+
+        for i, col in enumerate(ZSCORE_COLUMNS):
+            z = df[col].to_numpy(dtype=float)[ok]
+            valid = ~np.isnan(z)
+            gz, z = g[valid], z[valid]
+            n = np.bincount(gz, minlength=size).astype(float)
+            with np.errstate(invalid='ignore'):
+                mean = np.where(n > 0, np.bincount(gz, weights=z, minlength=size) / n, 0.0)
+            m2 = np.bincount(gz, weights=(z - mean[gz]) ** 2, minlength=size)
+            self._combine(i, n, mean, m2)
+        return self
+
+    def _combine(self, i, n_b, mean_b, m2_b):
+        n_a, mean_a = self.n[i], self.mean[i]
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean[i] = np.where(n > 0, mean_a + delta * n_b / n, 0.0)
+            self.m2[i] = np.where(n > 0, self.m2[i] + m2_b + delta ** 2 * n_a * n_b / n, 0.0)
+        self.n[i] = n
+
+    # Sumar otro acumulador a este
+    def merge(self, other):
+        self.rows += other.rows
+        self.excluded += other.excluded
+        for name in self.counts:
+            self.counts[name] += other.counts[name]
+        for i in range(len(ZSCORE_COLUMNS)):
+            self._combine(i, other.n[i], other.mean[i], other.m2[i])
+        return self
+
+    # Tabla de prevalencias: una fila por sexo y banda de edad, con el porcentaje de
+    # cada categoría sobre las filas clasificadas y n, media y desvío de cada z-score
+    def table(self):
+        index = pd.MultiIndex.from_product([[s.upper() for s in LMS_SEXES], [label for _, label in AGE_BANDS]],
+                                           names=['Sexo', 'Edad'])
+        out = pd.DataFrame(index=index)
+        out['filas'] = self.counts['Peso'].sum(axis=1)
+        for name, _, cats in CLASSIFICATIONS:
+            counts = self.counts[name]
+            classified = counts[:, :-1].sum(axis=1)
+            out[f'n_{name}'] = classified
+            with np.errstate(invalid='ignore', divide='ignore'):
+                for j, cat in enumerate(cats):
+                    out[f'{name}_{cat}_%'] = 100 * counts[:, j] / classified
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for i, col in enumerate(ZSCORE_COLUMNS):
+                n = self.n[i]
+                out[f'{col}_n'] = n.astype(np.int64)
+                out[f'{col}_media'] = np.where(n > 0, self.mean[i], np.nan)
+                out[f'{col}_de'] = np.where(n > 1, np.sqrt(self.m2[i] / (n - 1)), np.nan)
+        return out.reset_index()
+
+
+# Acumular un archivo de controles por bloques, sin guardar las filas puntuadas
+def accumulate_file(path, chunk_size=100_000, workers=1):
+    acc = PrevalenceAccumulator()
+    prof = get_profiler()
+    with parallel_scorer(workers) as scorer:
+        for chunk in pd.read_csv(path, chunksize=chunk_size, **CSV_OPTIONS):
+            chunk = score_controls(coerce_controls(chunk), workers=workers, scorer=scorer)
+            with prof.stage('acumular', len(chunk)):
+                acc.update(chunk)
+    return acc
+
+
+# Acumular varios archivos; con workers > 1 y más de un archivo cada archivo se
+# procesa en su propio proceso y los acumuladores se combinan al final
+def accumulate_files(paths, chunk_size=100_000, workers=1):
+    total = PrevalenceAccumulator()
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            for acc in pool.map(accumulate_file, paths, [chunk_size] * len(paths)):
+                total.merge(acc)
+    else:
+        for path in paths:
+            total.merge(accumulate_file(path, chunk_size, workers))
+    return total
+
+
+def save_accumulator(path, acc):
+    tmp = path + '.tmp'
+    pd.to_pickle(acc, tmp)
+    os.replace(tmp, path)
+
+
+def load_accumulator(path):
+    return pd.read_pickle(path)
@@ -0,0 +1,95 @@
+import contextlib
+import os
+import resource
+import time
+
+_PAGE_MB = os.sysconf('SC_PAGE_SIZE') / 2**20 if hasattr(os, 'sysconf') else 4096 / 2**20
+
+
+# Memoria residente actual en MB (en Linux desde /proc; si no, el pico del proceso)
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Registro de tiempo, filas y memoria por etapa del pipeline, con contadores de
+# resultados NaN o fuera de rango. Cada evento se envía también a los `hooks`:
+# funciones hook(evento, nombre, datos) con evento 'etapa' o 'contador'.
+# `stage` entrega el registro de la etapa para poder fijar 'filas' al terminar
+class Profiler:
+    enabled = True
+
+    def __init__(self, hooks=()):
+        self.hooks = list(hooks)
+        self.stages = {}
+        self.counters = {}
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None):
+        record = {'filas': rows or 0}
+        rss0 = current_rss_mb()
+        t0 = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['segundos'] = time.perf_counter() - t0
+            record['memoria_mb'] = current_rss_mb() - rss0
+            total = self.stages.setdefault(name, {'llamadas': 0, 'segundos': 0.0, 'filas': 0, 'memoria_mb': 0.0})
+            total['llamadas'] += 1
+            for key, value in record.items():
+                total[key] += value
+            for hook in self.hooks:
+                hook('etapa', name, record)
+
+    def count(self, name, value):
+        value = int(value)
+        self.counters[name] = self.counters.get(name, 0) + value
+        for hook in self.hooks:
+            hook('contador', name, {'valor': value})
+
+    # Tabla de tiempos por etapa y contadores
+    def report(self):
+        total = sum(s['segundos'] for s in self.stages.values()) or 1.0
+        lines = [f"{'etapa':<16} {'llamadas':>8} {'filas':>12} {'segundos':>10} {'%':>6} {'filas/s':>12} {'Δ memoria MB':>13}"]
+        for name, s in self.stages.items():
+            rate = f"{s['filas'] / s['segundos']:,.0f}" if s['filas'] and s['segundos'] else '-'
+            lines.append(f"{name:<16} {s['llamadas']:>8} {s['filas']:>12,} {s['segundos']:>10.4f} "
+                         f"{100 * s['segundos'] / total:>5.1f}% {rate:>12} {s['memoria_mb']:>13.1f}")
+        if self.counters:
+            lines.append('')
+            lines.extend(f"{name:<32} {value:>12,}" for name, value in self.counters.items())
+        return '\n'.join(lines)
+
+
+# Perfilador inactivo: las etapas no miden nada y los contadores se descartan
+class NullProfiler:
+    enabled = False
+    _null = contextlib.nullcontext({})
+
+    def stage(self, name, rows=None):
+        return self._null
+
+    def count(self, name, value):
+        pass
+
+
+_active = NullProfiler()
+
+
+def get_profiler():
+    return _active
+
+
+# Activar un perfilador mientras dura el bloque `with`
+@contextlib.contextmanager
+def profiling(profiler=None):
+    global _active
+    previous = _active
+    _active = profiler if profiler is not None else Profiler()
+    try:
+        yield _active
+    finally:
+        _active = previous
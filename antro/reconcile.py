@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from .profiling import get_profiler
+from .zscore import calculate_zscores_batch
+
+# Formato y columnas numéricas de calculosMuestraRandom.csv (exportación de WHO Anthro
+# con los z de MySQL y sus diferencias)
+REFERENCE_OPTIONS = {'sep': ';', 'decimal': ',', 'encoding': 'latin-1'}
+REFERENCE_NUMERIC = ['Age (d)', 'Weight (kg)', 'Height (cm)', 'WAZ', 'HAZ', 'BAZ',
+                     'PesoEdad', 'TallaEdad', 'IMCEdad', 'difPE', 'difTE', 'difIMCE']
+# Por indicador: z de Python, z de WHO Anthro, z de MySQL y diferencia MySQL - WHO del archivo
+INDICATORS = [('PesoEdad_Z', 'WAZ', 'PesoEdad', 'difPE'),
+              ('TallaEdad_Z', 'HAZ', 'TallaEdad', 'difTE'),
+              ('IMCEdad_Z', 'BAZ', 'IMCEdad', 'difIMCE')]
+# Comparaciones (nombre de la diferencia, minuendo, sustraendo)
+COMPARISONS = ([(f'dif_python_{who}', z, who) for z, who, _, _ in INDICATORS]
+               + [(f'dif_python_{sql}', z, sql) for z, _, sql, _ in INDICATORS]
+               + [(dif, sql, who) for _, who, sql, dif in INDICATORS])
+# Variables de la matriz de correlaciones (como en analisaDif.py más los z de Python)
+VARIABLES = (['Age (d)', 'Weight (kg)', 'Height (cm)', 'Sex_encoded', 'WAZ', 'HAZ', 'BAZ',
+              'PesoEdad', 'TallaEdad', 'IMCEdad']
+             + [z for z, _, _, _ in INDICATORS] + [name for name, _, _ in COMPARISONS])
+STRATA = ['Todos', 'F', 'M']
+
+
+# Puntuar un bloque del archivo de referencia con los tres indicadores y armar la
+# matriz de variables (filas × VARIABLES, NaN donde falta el dato) y el sexo
+# (0 femenino, 1 masculino, -1 desconocido)
+def reference_matrix(df):
+    for col in REFERENCE_NUMERIC:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    sex = df['Sex'].map({'Female': 0, 'Male': 1})
+    data = {'Sex_encoded': sex.to_numpy(dtype=float)}
+    z = calculate_zscores_batch(df['Age (d)'], df['Sex'].astype(str).str[0], df['Weight (kg)'], df['Height (cm)'])
+    # Columnas de referencia ausentes (archivos sin WHO Anthro o sin MySQL) quedan en NaN
+    for col in VARIABLES:
+        if col in z:
+            data[col] = z[col]
+        elif col in df.columns:
+            data[col] = df[col].to_numpy(dtype=float)
+    for name, a, b in COMPARISONS:
+        if name not in data:
+            data[name] = data.get(a, np.nan) - data.get(b, np.nan)
+    X = np.column_stack([np.broadcast_to(data.get(col, np.nan), len(df)) for col in VARIABLES])
+    return X, np.nan_to_num(data['Sex_encoded'], nan=-1).astype(np.int8)
+
+
+# Acumulador de estadísticos suficientes por pares de variables y por estrato de
+# sexo: n, Σx, Σx² y Σxy sobre las filas donde ambas variables tienen dato (NaN por
+# pares, como DataFrame.corr) más mínimo y máximo. Cada bloque se suma con productos
+# de matrices, así que la memoria depende del bloque y no del archivo. Los valores
+# se desplazan por la media del primer bloque para no perder precisión en las restas
+class ReconciliationAccumulator:
+    def __init__(self, variables=VARIABLES):
+        k = len(variables)
+        self.variables = list(variables)
+        self.shift = None
+        self.n = np.zeros((len(STRATA), k, k))
+        self.sx = np.zeros((len(STRATA), k, k))    # [i, j]: Σ x_i donde i y j tienen dato
+        self.sxx = np.zeros((len(STRATA), k, k))   # [i, j]: Σ x_i² donde i y j tienen dato
+        self.sxy = np.zeros((len(STRATA), k, k))
+        self.min = np.full((len(STRATA), k), np.inf)
+        self.max = np.full((len(STRATA), k), -np.inf)
+
+    def update(self, X, sex):
+        if self.shift is None:
+            with np.errstate(invalid='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) else np.zeros(X.shape[1])
+        valid = ~np.isnan(X)
+        X0 = np.where(valid, X - self.shift, 0.0)
+        V = valid.astype(float)
+        # Cada fila se suma una vez en su estrato de sexo (o en ninguno si es
+        # desconocido) y el estrato Todos se arma sumando los parciales
+        for code in (0, 1, -1):
+            rows = sex == code
+            if not rows.any():
+                continue
+            x, v, ok = X0[rows], V[rows], valid[rows]
+            partial = (v.T @ v, x.T @ v, (x * x).T @ v, x.T @ x)
+            low = np.where(ok, x, np.inf).min(axis=0)
+            high = np.where(ok, x, -np.inf).max(axis=0)
+            for s in ([0, code + 1] if code >= 0 else [0]):
+                for total, value in zip((self.n, self.sx, self.sxx, self.sxy), partial):
+                    total[s] += value
+                self.min[s] = np.fmin(self.min[s], low)
+                self.max[s] = np.fmax(self.max[s], high)
+        return self
+
+    # Sesgo, desvío, RMSE y rango de cada diferencia por estrato
+    def agreement(self):
+        records = []
+        for s, stratum in enumerate(STRATA):
+            for name, a, b in COMPARISONS:
+                i = self.variables.index(name)
+                n, sx, sxx = self.n[s, i, i], self.sx[s, i, i], self.sxx[s, i, i]
+                c = self.shift[i] if self.shift is not None else 0.0
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    records.append({
+                        'estrato': stratum, 'diferencia': name, 'comparacion': f'{a} - {b}', 'n': int(n),
+                        'sesgo': c + sx / n if n else np.nan,
+                        'de': np.sqrt(max(sxx - sx * sx / n, 0.0) / (n - 1)) if n > 1 else np.nan,
+                        'rmse': np.sqrt((sxx + 2 * c * sx + n * c * c) / n) if n else np.nan,
+                        'min': c + self.min[s, i] if n else np.nan,
+                        'max': c + self.max[s, i] if n else np.nan,
+                    })
+        return pd.DataFrame(records)
+
+    # Matrices de correlación de Pearson, p-valor (t de Student con n-2 grados de
+    # libertad, como scipy.stats.pearsonr) y n por pares, para un estrato
+    def correlations(self, stratum='Todos'):
+        from scipy.stats import t as student_t
+
+        s = STRATA.index(stratum)
+        n, sx, sxx, sxy = self.n[s], self.sx[s], self.sxx[s], self.sxy[s]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = sxy - sx * sx.T / n
+            var_x = sxx - sx * sx / n
+            var_y = sxx.T - sx.T * sx.T / n
+            r = np.clip(cov / np.sqrt(var_x * var_y), -1, 1)
+            # Variables constantes en el estrato (varianza de redondeo): sin correlación
+            r[(n < 2) | (var_x <= 1e-12 * sxx) | (var_y <= 1e-12 * sxx.T)] = np.nan
+            df = n - 2
+            tstat = r * np.sqrt(df / (1 - r * r))
+            p = np.where(df > 0, 2 * student_t.sf(np.abs(tstat), np.maximum(df, 1)), np.nan)
+            p[np.abs(r) == 1] = 0.0
+        frame = lambda m: pd.DataFrame(m, index=self.variables, columns=self.variables)  # noqa: E731
+        return frame(r), frame(p), frame(n.astype(np.int64))
+
+    # Correlaciones de todos los pares y estratos en formato largo
+    def correlation_table(self):
+        frames = []
+        iu = np.triu_indices(len(self.variables), 1)
+        for stratum in STRATA:
+            r, p, n = self.correlations(stratum)
+            frames.append(pd.DataFrame({
+                'estrato': stratum,
+                'variable_x': np.array(self.variables)[iu[0]],
+                'variable_y': np.array(self.variables)[iu[1]],
+                'r': r.to_numpy()[iu], 'p_valor': p.to_numpy()[iu], 'n': n.to_numpy()[iu],
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+
+# Conciliar un archivo con la forma de calculosMuestraRandom.csv, por bloques
+def reconcile_file(path, chunk_size=250_000):
+    acc = ReconciliationAccumulator()
+    prof = get_profiler()
+    for chunk in pd.read_csv(path, chunksize=chunk_size, **REFERENCE_OPTIONS):
+        with prof.stage('puntuar', len(chunk)):
+            X, sex = reference_matrix(chunk)
+        with prof.stage('acumular', len(chunk)):
+            acc.update(X, sex)
+    return acc
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from .age import DATE_FORMAT, _EPOCH, parse_dates
+
+# Representación compacta de controles puntuados para lotes grandes en memoria:
+# fechas como días desde 1970-01-01 (Int32), edad en días entera, mediciones,
+# IMC y z-scores en float32, textos repetidos (Sexo, Nombre, clasificaciones, Edad)
+# como categorías y enteros con el tipo más chico que los contiene. El esquema
+# original queda en df.attrs para volver a él con expand_records.
+# float32 guarda ~7 cifras significativas: sobra para mediciones con un decimal y
+# z-scores con dos, pero la vuelta a float64 no es idéntica bit a bit
+DATE_COLUMNS = ['FechaNacimiento', 'FechaControl']
+DAY_COLUMNS = ['edad_dias']
+# Textos con más valores distintos que esta fracción de filas (ids) no se convierten en categoría
+MAX_CATEGORY_FRACTION = 0.5
+
+
+# Memoria por fila de un DataFrame, incluidos los textos
+def bytes_per_row(df):
+    return df.memory_usage(deep=True, index=False).sum() / max(len(df), 1)
+
+
+def _is_text(col):
+    return pd.api.types.is_object_dtype(col) or pd.api.types.is_string_dtype(col)
+
+
+# Pasar un DataFrame de controles (puntuado o no) a la representación compacta
+def compact_records(df):
+    out = {}
+    for name, col in df.items():
+        if name in DATE_COLUMNS and _is_text(col):
+            out[name] = pd.array(parse_dates(col), dtype='Int32')
+        elif name in DAY_COLUMNS:
+            out[name] = pd.array(np.asarray(col, dtype=float), dtype='Int32')
+        elif isinstance(col.dtype, pd.CategoricalDtype):
+            out[name] = col
+        elif pd.api.types.is_float_dtype(col):
+            out[name] = col.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(col) and not pd.api.types.is_extension_array_dtype(col):
+            out[name] = pd.to_numeric(col, downcast='integer')
+        elif _is_text(col) and col.nunique() <= MAX_CATEGORY_FRACTION * len(col):
+            out[name] = col.astype('category')
+        else:
+            out[name] = col
+    compact = pd.DataFrame(out, index=df.index)
+    compact.attrs['esquema'] = {name: col.dtype for name, col in df.items()}
+    return compact
+
+
+# Volver de la representación compacta al esquema original (fechas 'dd/mm/aaaa',
+# float64, textos). Sin esquema en attrs se usan los tipos por defecto del pipeline
+def expand_records(compact):
+    schema = compact.attrs.get('esquema', {})
+    out = {}
+    for name, col in compact.items():
+        dtype = schema.get(name)
+        if name in DATE_COLUMNS and pd.api.types.is_integer_dtype(col):
+            # Cada fecha distinta se formatea una sola vez
+            codes, uniques = pd.factorize(col)
+            text = pd.DatetimeIndex(_EPOCH + np.asarray(uniques, dtype=np.int64).astype('timedelta64[D]')).strftime(DATE_FORMAT)
+            out[name] = pd.Series(np.append(text.to_numpy(dtype=object), None)[codes], index=compact.index,
+                                  dtype=dtype if dtype is not None else object)
+        elif dtype is not None:
+            out[name] = col.to_numpy(dtype=float, na_value=np.nan) if pd.api.types.is_float_dtype(dtype) else col.astype(dtype)
+        elif name in DAY_COLUMNS or pd.api.types.is_float_dtype(col):
+            out[name] = col.to_numpy(dtype=float, na_value=np.nan)
+        elif pd.api.types.is_integer_dtype(col):
+            out[name] = col.astype(np.int64)
+        else:
+            out[name] = col
+    return pd.DataFrame(out, index=compact.index)
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import lms
+from .age import calculate_age_days, format_age
+from .classification import classify_height, classify_weight
+from .zscore import calculate_zscores_batch
+
+# Campos de cada control (como en datosAntro.csv; Sexo 'F'/'M' o 'Femenino'/'Masculino')
+REQUEST_FIELDS = ['FechaNacimiento', 'FechaControl', 'Sexo', 'Peso', 'Talla']
+# Campos de la respuesta, en orden
+RESPONSE_FIELDS = ['edad_dias', 'Edad', 'IMC', 'PesoEdad_Z', 'TallaEdad_Z', 'IMCEdad_Z',
+                   'ClasificacionPeso', 'ClasificacionTalla']
+# Tipos JSON aceptados por campo (null se acepta en todos y da resultado vacío)
+FIELD_TYPES = {'FechaNacimiento': (str,), 'FechaControl': (str,), 'Sexo': (str,),
+               'Peso': (int, float, str), 'Talla': (int, float, str)}
+MAX_BODY = 8 << 20
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Validar un control del cuerpo JSON
+def _control(record):
+    if not isinstance(record, dict):
+        raise RequestError(400, 'cada control debe ser un objeto JSON')
+    missing = [f for f in REQUEST_FIELDS if f not in record]
+    if missing:
+        raise RequestError(400, f"faltan campos: {', '.join(missing)}")
+    wrong = [f for f, types in FIELD_TYPES.items()
+             if record[f] is not None and (isinstance(record[f], bool) or not isinstance(record[f], types))]
+    if wrong:
+        raise RequestError(400, f"tipo inválido en: {', '.join(wrong)}")
+    return record
+
+
+# Valores como lista de Python, con None en lugar de NaN o categoría vacía
+def _values(values):
+    return [None if v is None or v != v else v for v in np.asarray(values, dtype=object).tolist()]
+
+
+# Puntuar y clasificar una lista de controles con una sola llamada vectorizada: los
+# mismos pasos que score_controls pero sobre arreglos, sin armar un DataFrame, que
+# en lotes de pocos controles cuesta más que el cálculo
+def score_records(records):
+    fields = {f: [r[f] for r in records] for f in REQUEST_FIELDS}
+    age_days = calculate_age_days(fields['FechaNacimiento'], fields['FechaControl'])
+    sexo = np.array([str(s)[:1] for s in fields['Sexo']])  # 'Femenino'/'Masculino' o 'F'/'M'
+    peso = pd.to_numeric(pd.Series(fields['Peso'], dtype=object), errors='coerce').to_numpy(dtype=float)
+    talla = pd.to_numeric(pd.Series(fields['Talla'], dtype=object), errors='coerce').to_numpy(dtype=float)
+    z = calculate_zscores_batch(age_days, sexo, peso, talla)
+    columns = [
+        [None if d != d else int(d) for d in age_days.tolist()],
+        _values(format_age(age_days)),
+        _values(peso / (talla / 100) ** 2),
+        _values(z['PesoEdad_Z']), _values(z['TallaEdad_Z']), _values(z['IMCEdad_Z']),
+        _values(classify_weight(z['PesoEdad_Z'], z['IMCEdad_Z'], age_days)),
+        _values(classify_height(z['TallaEdad_Z'])),
+    ]
+    return [dict(zip(RESPONSE_FIELDS, row)) for row in zip(*columns)]
+
+
+# Agrupa los controles que llegan sueltos: el primero abre una ventana de `window`
+# segundos y todo lo que llega en ella (hasta `max_batch`) se puntúa en un lote. El
+# cálculo corre en un hilo aparte para que el bucle siga aceptando pedidos. Si el
+# lote falla se puntúa cada control por separado, para que el error llegue solo al
+# pedido que lo causó
+class MicroBatcher:
+    def __init__(self, window=0.002, max_batch=512):
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.records = 0
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown()
+
+    async def submit(self, record):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    # Puntuar una lista de controles en el hilo de cálculo
+    async def score(self, records):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, score_records, records)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(pending) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            while len(pending) < self.max_batch and not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+
+            self.batches += 1
+            self.records += len(pending)
+            try:
+                results = await self.score([record for record, _ in pending])
+            except Exception:
+                results = None
+            for i, (record, future) in enumerate(pending):
+                if future.done():
+                    continue
+                if results is not None:
+                    future.set_result(results[i])
+                    continue
+                try:
+                    future.set_result((await self.score([record]))[0])
+                except Exception as e:
+                    future.set_exception(e)
+
+
+# Servicio HTTP/1.1 mínimo (con keep-alive) sobre asyncio:
+#   POST /zscore    un control -> un resultado (agrupado en micro-lotes)
+#   POST /zscores   lista de controles -> lista de resultados (un lote por pedido)
+#   GET  /estado    lotes y controles puntuados
+class ScoringService:
+    def __init__(self, window=0.002, max_batch=512):
+        self.batcher = MicroBatcher(window, max_batch)
+        self.started = time.time()
+
+    async def handle(self, method, path, body):
+        if path == '/estado':
+            if method != 'GET':
+                raise RequestError(405, 'use GET')
+            b = self.batcher
+            return {'lotes': b.batches, 'controles': b.records,
+                    'controles_por_lote': b.records / b.batches if b.batches else 0.0,
+                    'segundos': time.time() - self.started}
+        if path not in ('/zscore', '/zscores'):
+            raise RequestError(404, f'ruta desconocida: {path}')
+        if method != 'POST':
+            raise RequestError(405, 'use POST')
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise RequestError(400, 'el cuerpo no es JSON válido')
+        if path == '/zscore':
+            return await self.batcher.submit(_control(payload))
+        if not isinstance(payload, list):
+            raise RequestError(400, 'se espera una lista de controles')
+        return await self.batcher.score([_control(r) for r in payload]) if payload else []
+
+    async def connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+
+                status = 200
+                # Sin un largo válido no se sabe dónde termina el cuerpo: se responde y se cierra
+                if length < 0:
+                    status, result = 400, {'error': 'Content-Length inválido'}
+                    keep_alive = False
+                elif length > MAX_BODY:
+                    status, result = 413, {'error': 'cuerpo demasiado grande'}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        result = await self.handle(method, path.split('?', 1)[0], body)
+                    except RequestError as e:
+                        status, result = e.status, {'error': str(e)}
+                    except Exception as e:
+                        status, result = 500, {'error': f'{type(e).__name__}: {e}'}
+
+                data = json.dumps(result, ensure_ascii=False).encode('utf-8')
+                writer.write(f'HTTP/1.1 {status} {_REASONS[status]}\r\n'
+                             f'Content-Type: application/json; charset=utf-8\r\n'
+                             f'Content-Length: {len(data)}\r\n'
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+# Levantar el servicio en host:port. La grilla LMS se carga una vez al iniciar y un
+# control de prueba deja listo el camino de cálculo antes del primer pedido
+async def serve(host='127.0.0.1', port=8080, window=0.002, max_batch=512, ready=None, log=print):
+    lms.get_lms_grid()
+    score_records([{'FechaNacimiento': '01/01/2020', 'FechaControl': '01/01/2021', 'Sexo': 'F',
+                    'Peso': 9.0, 'Talla': 74.0}])
+    service = ScoringService(window, max_batch)
+    service.batcher.start()
+    server = await asyncio.start_server(service.connection, host, port, backlog=1024)
+    if log is not None:
+        log(f"Escuchando en http://{host}:{server.sockets[0].getsockname()[1]} "
+            f"(ventana {window * 1000:g} ms, lote máximo {max_batch})")
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.batcher.close()
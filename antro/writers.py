@@ -0,0 +1,140 @@
+import os
+
+# Escritores de resultados que aceptan el DataFrame por bloques: write(df) se puede
+# llamar muchas veces y close() cierra el archivo. El formato sale de la extensión
+# de salida o se elige explícitamente con `formato`.
+
+
+class _Writer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# CSV con el formato de datosAntro.csv (';' y coma decimal); con append=True agrega
+# filas a un archivo existente sin repetir el encabezado
+class CSVWriter(_Writer):
+    def __init__(self, path, append=False, sep=';', decimal=',', encoding='latin-1'):
+        self._f = open(path, 'a' if append else 'w', encoding=encoding, newline='')
+        self._header = not append
+        self._options = {'sep': sep, 'decimal': decimal}
+
+    def write(self, df):
+        df.to_csv(self._f, header=self._header, index=False, **self._options)
+        self._header = False
+
+    def close(self):
+        self._f.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Los formatos Parquet y Feather requieren pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+# Base de Parquet y Feather: el esquema Arrow se fija con el primer bloque y los
+# siguientes se convierten a él. Una columna de objetos sin ningún dato en el primero
+# (p. ej. Edad si todas las fechas son inválidas) quedaría con tipo null y no
+# aceptaría texto después: esas columnas se fijan como texto. Una columna de texto de
+# la entrada vacía en el primer bloque llegaría como float si read_csv infiriera su
+# tipo; score_file_chunked la lee como texto. Los enteros aceptan luego flotantes con
+# NaN (quedan null)
+class _ArrowWriter(_Writer):
+    def __init__(self, path):
+        self._pa = _import_pyarrow()
+        self._path = path
+        self._writer = None
+        self._schema = None
+
+    def _table(self, df):
+        pa = self._pa
+        if self._schema is None:
+            schema = pa.Table.from_pandas(df, preserve_index=False).schema
+            for i, field in enumerate(schema):
+                if pa.types.is_null(field.type):
+                    schema = schema.set(i, field.with_type(pa.large_string()))
+            self._schema = schema
+        return pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# Parquet: cada bloque es un row group
+class ParquetWriter(_ArrowWriter):
+    def write(self, df):
+        import pyarrow.parquet
+
+        table = self._table(df)
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self._path, self._schema)
+        self._writer.write_table(table)
+
+
+# Feather v2 (archivo Arrow IPC): cada bloque es un record batch
+class FeatherWriter(_ArrowWriter):
+    def write(self, df):
+        table = self._table(df)
+        if self._writer is None:
+            self._writer = self._pa.ipc.new_file(self._path, self._schema)
+        self._writer.write_table(table)
+
+
+# Excel en modo write_only de openpyxl: las filas se escriben en streaming sin
+# mantener el libro completo en memoria
+class ExcelWriter(_Writer):
+    def __init__(self, path):
+        from openpyxl import Workbook
+
+        self._path = path
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet()
+        self._header = True
+
+    def write(self, df):
+        if self._header:
+            self._ws.append(list(df.columns))
+            self._header = False
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            self._ws.append(row)
+
+    def close(self):
+        self._wb.save(self._path)
+
+
+WRITERS = {
+    'csv': CSVWriter,
+    'parquet': ParquetWriter,
+    'feather': FeatherWriter,
+    'xlsx': ExcelWriter,
+}
+EXTENSIONS = {'.csv': 'csv', '.parquet': 'parquet', '.feather': 'feather', '.arrow': 'feather', '.xlsx': 'xlsx'}
+
+
+def output_format(path, formato=None):
+    if formato is not None:
+        if formato not in WRITERS:
+            raise ValueError(f"Formato de salida desconocido: {formato} (opciones: {', '.join(WRITERS)})")
+        return formato
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in EXTENSIONS:
+        raise ValueError(f"No se reconoce la extensión '{ext}' de {path}; use --formato")
+    return EXTENSIONS[ext]
+
+
+# Abrir un escritor por bloques para `path`
+def open_writer(path, formato=None):
+    return WRITERS[output_format(path, formato)](path)
+
+
+# Escribir un DataFrame completo con el escritor que corresponda
+def write_dataframe(df, path, formato=None):
+    with open_writer(path, formato) as writer:
+        writer.write(df)
@@ -0,0 +1,160 @@
+import numpy as np
+
+from .lms import LMS_MAX_DAYS, get_interpolated_lms_batch
+from .profiling import get_profiler
+
+# Versión del cálculo de z-scores; incrementarla invalida los resultados guardados
+# por el modo incremental
+ZSCORE_VERSION = 2
+
+# Elementos por bloque del kernel: los temporales del bloque (128 KB cada uno)
+# quedan en la cache L2
+ZSCORE_BLOCK = 16384
+# |L| menor que esto se trata como L = 0 (fórmula logarítmica)
+L_EPS = 1e-7
+# Peso/Edad e IMC/Edad usan el cálculo restringido de la OMS más allá de ±3 SD
+RESTRICTED_INDICATORS = ('tablaPE', 'tablaIMC')
+
+# Función para calcular z-score
+def calculate_zscore(age_days, value, L, M, S):
+    if np.isnan(age_days) or np.isnan(value) or value <= 0:
+        return np.nan
+    if L == 0:
+        return np.log(value / M) / S
+    else:
+        return ((value / M) ** L - 1) / (L * S)
+
+# Medición en z = ±2 y ±3 SD para las filas `idx` (cálculo restringido de la OMS)
+def _sd_at(L, M, S, idx, z):
+    L, M, S = L[idx], M[idx], S[idx]
+    small = np.abs(L) < L_EPS
+    L_safe = np.where(small, 1.0, L)
+    return np.where(small, M * np.exp(S * z), M * (1 + L_safe * S * z) ** (1 / L_safe))
+
+
+# Kernel de z-scores LMS: recorre los datos en bloques de ZSCORE_BLOCK elementos con
+# temporales reutilizados y escribe en `out`, sin arreglos del tamaño de la entrada.
+# En el mismo bloque resuelve L ≈ 0, valores no positivos (NaN) y, con
+# restricted=True, el ajuste de la OMS más allá de ±3 SD:
+#   z > 3:  3 + (y - SD3pos) / (SD3pos - SD2pos)
+#   z < -3: -3 + (y - SD3neg) / (SD2neg - SD3neg)
+# Para |z| <= 3 el resultado es idéntico bit a bit a ((y/M)**L - 1) / (L*S)
+def lms_zscores(value, L, M, S, out=None, restricted=False, block=ZSCORE_BLOCK):
+    value = np.asarray(value, dtype=float)
+    L, M, S = (np.asarray(a, dtype=float) for a in (L, M, S))
+    n = len(value)
+    if out is None:
+        out = np.empty(n)
+    t = np.empty(min(block, n))
+    u = np.empty(min(block, n))
+    bad = np.empty(min(block, n), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for start in range(0, n, block):
+            end = min(start + block, n)
+            k = end - start
+            y, l, m, s, o = value[start:end], L[start:end], M[start:end], S[start:end], out[start:end]
+            tb, ub, bb = t[:k], u[:k], bad[:k]
+
+            # ((y/M)**L - 1) / (L*S)
+            np.divide(y, m, out=tb)
+            np.power(tb, l, out=ub)
+            np.subtract(ub, 1, out=ub)
+            np.multiply(l, s, out=o)
+            np.divide(ub, o, out=o)
+
+            # L ≈ 0: log(y/M) / S
+            np.less(np.abs(l, out=ub), L_EPS, out=bb)
+            if bb.any():
+                idx = np.flatnonzero(bb)
+                o[idx] = np.log(tb[idx]) / s[idx]
+
+            if restricted:
+                np.greater(o, 3, out=bb)
+                if bb.any():
+                    idx = np.flatnonzero(bb)
+                    sd3 = _sd_at(l, m, s, idx, 3)
+                    o[idx] = 3 + (y[idx] - sd3) / (sd3 - _sd_at(l, m, s, idx, 2))
+                np.less(o, -3, out=bb)
+                if bb.any():
+                    idx = np.flatnonzero(bb)
+                    sd3 = _sd_at(l, m, s, idx, -3)
+                    o[idx] = -3 + (y[idx] - sd3) / (_sd_at(l, m, s, idx, -2) - sd3)
+
+            # Valores no positivos o NaN
+            np.greater(y, 0, out=bb)
+            np.logical_not(bb, out=bb)
+            np.copyto(o, np.nan, where=bb)
+    return out
+
+
+# Versión vectorizada de calculate_zscore
+def calculate_zscore_batch(value, L, M, S, restricted=False):
+    return lms_zscores(value, L, M, S, restricted=restricted)
+
+# Z-scores de Peso/Edad, Talla/Edad e IMC/Edad para arreglos completos; con `cache`
+# (un LMSCache) la búsqueda de L, M y S pasa por el cache
+def calculate_zscores_batch(age_days, sexo, peso, talla, cache=None):
+    age_days = np.asarray(age_days, dtype=float)
+    sexo = np.char.lower(np.asarray(sexo, dtype=str))
+    peso = np.asarray(peso, dtype=float)
+    talla = np.asarray(talla, dtype=float)
+    imc = peso / (talla / 100) ** 2
+
+    prof = get_profiler()
+    lookup = get_interpolated_lms_batch if cache is None else cache.get_batch
+    result = {}
+    for col, indicator, value, max_days in [('PesoEdad_Z', 'tablaPE', peso, 3650),   # Peso/Edad hasta 10 años
+                                            ('TallaEdad_Z', 'tablaTE', talla, 6935),  # Talla/Edad hasta 19 años
+                                            ('IMCEdad_Z', 'tablaIMC', imc, 6935)]:    # IMC/Edad hasta 19 años
+        restricted = indicator in RESTRICTED_INDICATORS
+        mask = age_days <= max_days
+        if mask.all():
+            with prof.stage('lms', len(mask)):
+                L, M, S = lookup(indicator, age_days, sexo)
+            with prof.stage('zscore', len(mask)):
+                z = lms_zscores(value, L, M, S, restricted=restricted)
+        else:
+            z = np.full(age_days.shape, np.nan)
+            if mask.any():
+                rows = int(mask.sum())
+                with prof.stage('lms', rows):
+                    L, M, S = lookup(indicator, age_days[mask], sexo[mask])
+                with prof.stage('zscore', rows):
+                    z[mask] = lms_zscores(value[mask], L, M, S, restricted=restricted)
+        result[col] = z
+    return result
+
+# Inversa de calculate_zscore_batch: medición que corresponde a cada z. Con
+# restricted=True, más allá de ±3 SD la medición crece linealmente con la
+# distancia entre 2 y 3 SD, como en el cálculo restringido de la OMS
+def calculate_measurement_batch(z, L, M, S, restricted=False):
+    z = np.asarray(z, dtype=float)
+    small = np.abs(L) < L_EPS
+    L_safe = np.where(small, 1.0, L)
+
+    def at(zz):
+        return np.where(small, M * np.exp(S * zz), M * (1 + L_safe * S * zz) ** (1 / L_safe))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = at(z)
+        if restricted:
+            for sign in (1, -1):
+                tail = sign * z > 3
+                if tail.any():
+                    sd3, sd2 = at(3 * sign), at(2 * sign)
+                    value = np.where(tail, sd3 + (z - 3 * sign) * sign * (sd3 - sd2), value)
+    return value
+
+# Peso, talla o IMC para arreglos de edades, sexos y z-scores del indicador
+def calculate_measurements(indicator, age_days, sexo, z):
+    L, M, S = get_interpolated_lms_batch(indicator, age_days, np.char.lower(np.asarray(sexo, dtype=str)))
+    return calculate_measurement_batch(z, L, M, S, restricted=indicator in RESTRICTED_INDICATORS)
+
+# Curvas de referencia (una columna por z) para un indicador y sexo; por defecto
+# las de estandares.csv: -3, -2, -1.5, -1, 0, 1, 1.5, 2 y 3 SD de 0 a 6935 días
+def sd_curves(indicator, sexo, age_days=None, zs=(-3, -2, -1.5, -1, 0, 1, 1.5, 2, 3)):
+    age_days = np.arange(LMS_MAX_DAYS + 1) if age_days is None else np.asarray(age_days, dtype=float)
+    L, M, S = get_interpolated_lms_batch(indicator, age_days, np.full(age_days.shape, sexo.lower()))
+    zs = np.asarray(zs, dtype=float)
+    return calculate_measurement_batch(zs[None, :], L[:, None], M[:, None], S[:, None],
+                                       restricted=indicator in RESTRICTED_INDICATORS)
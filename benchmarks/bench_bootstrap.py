@@ -0,0 +1,76 @@
+# Bootstrap de los estadísticos de concordancia: motor por bloques de antro.bootstrap
+# con 1, 2 y 4 procesos contra un bootstrap en un bucle de Python (una réplica por
+# iteración). Verifica que el resultado no dependa del número de procesos y mide el
+# pico de memoria asignada con tracemalloc en el proceso principal.
+# Uso: python benchmarks/bench_bootstrap.py [--filas N] [--replicas R] [--procesos 1 2 4]
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antro.bootstrap import COLUMNS, _D, bootstrap_agreement  # noqa: E402
+
+
+# Columnas de comparación sintéticas: z de referencia y z con error, con algunos NaN
+def synthetic_data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    data = np.empty((n, len(COLUMNS)))
+    ref = rng.normal(0, 1.2, (n, len(COLUMNS)))
+    data[:] = ref + rng.normal(0, 0.02, ref.shape)
+    data[rng.random(ref.shape) < 0.05] = np.nan
+    return data
+
+
+# Sesgo y RMSE de cada diferencia con una réplica por iteración
+def naive_bootstrap(data, replicates, seed=0):
+    rng = np.random.default_rng(seed)
+    out = np.empty((replicates, 2, len(_D)))
+    for r in range(replicates):
+        sample = data[rng.integers(0, len(data), len(data))][:, _D]
+        out[r, 0] = np.nanmean(sample, axis=0)
+        out[r, 1] = np.sqrt(np.nanmean(sample ** 2, axis=0))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--replicas', type=int, default=200)
+    parser.add_argument('--procesos', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    data = synthetic_data(args.filas)
+    print(f"{args.filas} filas × {len(COLUMNS)} columnas ({data.nbytes / 2**20:.0f} MB), {args.replicas} réplicas, "
+          f"{os.cpu_count()} CPU")
+
+    naive_reps = max(1, min(args.replicas, 20))
+    t0 = time.perf_counter()
+    naive_bootstrap(data, naive_reps)
+    naive = (time.perf_counter() - t0) / naive_reps
+    print(f"{'bucle de Python':<16} {1 / naive:>10.1f} réplicas/s (medido con {naive_reps})")
+
+    reference = None
+    for workers in args.procesos:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        _, samples = bootstrap_agreement(data, args.replicas, seed=1, workers=workers)
+        dt = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        if reference is None:
+            reference = samples
+        same = np.array_equal(reference, samples, equal_nan=True)
+        print(f"{'procesos=' + str(workers):<16} {args.replicas / dt:>10.1f} réplicas/s  x{naive * args.replicas / dt:.1f}  "
+              f"pico {peak / 2**20:7.1f} MB  idéntico={same}")
+        if not same:
+            print("Error: el resultado depende del número de procesos")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
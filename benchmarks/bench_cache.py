@@ -0,0 +1,60 @@
+# LMSCache contra la búsqueda directa en la grilla compilada (get_interpolated_lms_batch)
+# con el cache ya cargado, para edades enteras (no pasan por el cache), fraccionarias
+# repetidas (edades en meses pasadas a días) y fraccionarias casi todas distintas.
+# Verifica que L, M y S sean idénticos con y sin cache y que las edades NaN no ocupen
+# entradas.
+# Uso: python benchmarks/bench_cache.py [--filas N] [--entradas MAXSIZE]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antro.cache import LMSCache  # noqa: E402
+from antro.lms import get_interpolated_lms_batch  # noqa: E402
+
+
+def age_cases(n, seed=0):
+    rng = np.random.default_rng(seed)
+    months = rng.integers(0, 226, n)
+    return {
+        'enteras': rng.integers(0, 6900, n).astype(float),
+        'meses en días': months * 30.4375,
+        'fraccionarias distintas': rng.uniform(0, 6900, n),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--entradas', type=int, default=100_000)
+    args = parser.parse_args()
+
+    sexo = np.random.default_rng(1).choice(np.array(['m', 'f']), args.filas)
+    print(f"{args.filas} filas, cache de {args.entradas} entradas")
+    ok = True
+    for label, ages in age_cases(args.filas).items():
+        ages[::97] = np.nan
+        t0 = time.perf_counter()
+        ref = get_interpolated_lms_batch('tablaPE', ages, sexo)
+        direct = time.perf_counter() - t0
+        cache = LMSCache(args.entradas)
+        cache.get_batch('tablaPE', ages, sexo)
+        t0 = time.perf_counter()
+        out = cache.get_batch('tablaPE', ages, sexo)
+        warm = time.perf_counter() - t0
+        identical = all(np.array_equal(a, b, equal_nan=True) for a, b in zip(ref, out))
+        clean = not any(np.isnan(age) for _, _, age in cache._data)
+        ok &= identical and clean
+        print(f"{label:<24} directo {direct:6.3f} s  cache {warm:6.3f} s  x{direct / warm:.2f}  "
+              f"entradas {len(cache._data):>7}  idéntico={identical}")
+    if not ok:
+        print("Error: el cache cambia el resultado o guarda edades NaN")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
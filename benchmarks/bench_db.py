@@ -0,0 +1,95 @@
+# Conector de base de datos sobre SQLite (reemplazo local de MySQL): carga controles
+# sintéticos en datos_generados, los puntúa con antro.db.score_table y reporta filas/s
+# de lectura y de escritura. Compara con la escritura fila por fila con commit por
+# fila (como un INSERT por control) y verifica que el upsert deje el mismo resultado.
+# Uso: python benchmarks/bench_db.py [--filas N] [--lote FILAS] [--base archivo.db]
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antro.db import score_table, sqlite_pool  # noqa: E402
+from antro.generator import generate_controls, valid_ages  # noqa: E402
+
+
+def load_source(path, n):
+    df = generate_controls(n, valid_ages(), np.random.default_rng(0))
+    df['ID'] = df['ID'] + pd.Series(np.arange(n)).astype(str)  # clave única
+    with sqlite3.connect(path) as conn:
+        df.to_sql('datos_generados', conn, index=False, if_exists='replace', chunksize=50_000)
+        conn.execute('DROP TABLE IF EXISTS zscores_generados')
+    conn.close()
+
+
+# Insertar y confirmar de a una fila las primeras `n` filas de resultados en una
+# tabla común de la misma base y en modo WAL, como escribe score_table (una tabla
+# TEMP no se sincroniza a disco y mediría de más)
+def row_by_row(path, n):
+    with sqlite3.connect(path) as conn:
+        conn.execute('PRAGMA journal_mode=WAL')
+        rows = conn.execute(f'SELECT * FROM zscores_generados LIMIT {n}').fetchall()
+        conn.execute('DROP TABLE IF EXISTS copia')
+        conn.execute('CREATE TABLE copia AS SELECT * FROM zscores_generados WHERE 0')
+        t0 = time.perf_counter()
+        for row in rows:
+            conn.execute(f"INSERT INTO copia VALUES ({', '.join(['?'] * len(row))})", row)
+            conn.commit()
+        dt = time.perf_counter() - t0
+        conn.execute('DROP TABLE copia')
+    conn.close()
+    return len(rows) / dt
+
+
+def snapshot(path):
+    with sqlite3.connect(path) as conn:
+        df = pd.read_sql('SELECT * FROM zscores_generados ORDER BY ID', conn)
+    conn.close()
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=500_000)
+    parser.add_argument('--lote', type=int, default=50_000)
+    parser.add_argument('--base', default=None, help='archivo SQLite (por defecto uno temporal)')
+    args = parser.parse_args()
+
+    tmp = None
+    if args.base is None:
+        tmp = tempfile.TemporaryDirectory()
+        args.base = os.path.join(tmp.name, 'antro.db')
+    load_source(args.base, args.filas)
+    print(f"{args.filas} controles en {args.base}, lotes de {args.lote}")
+
+    pool = sqlite_pool(args.base)
+    try:
+        for label, upsert in (('insert', False), ('upsert', True)):
+            summary = score_table(pool, 'datos_generados', 'zscores_generados', batch_size=args.lote,
+                                  upsert=upsert, log=None)
+            print(f"{label:<8} {summary['filas'] / summary['segundos']:>10,.0f} filas/s total  "
+                  f"lectura {summary['lectura_filas_s']:>10,.0f} filas/s  escritura {summary['escritura_filas_s']:>10,.0f} filas/s")
+            if not upsert:
+                first = snapshot(args.base)
+    finally:
+        pool.close()
+
+    same = snapshot(args.base).equals(first)
+    print(f"{'fila a fila':<8} {'':>21}  escritura {row_by_row(args.base, min(args.filas, 5_000)):>10,.0f} filas/s "
+          f"(commit por fila)")
+    print(f"upsert idéntico al insert: {same}")
+    if tmp is not None:
+        tmp.cleanup()
+    if not same:
+        print("Error: el upsert cambió los resultados")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# Mide el tiempo de `import antro` en un intérprete nuevo, sin tocar las tablas.
+# Uso: python benchmarks/bench_import.py [--repeticiones N] [--limite-ms MS]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = """
+import sys, time
+t0 = time.perf_counter()
+import antro
+dt = time.perf_counter() - t0
+pesados = [m for m in ('numpy', 'pandas', 'scipy', 'antro.lms') if m in sys.modules]
+print(dt * 1000, ','.join(pesados))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--limite-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    tiempos = []
+    for _ in range(args.repeticiones):
+        out = subprocess.run([sys.executable, '-c', SNIPPET], cwd=REPO_DIR, capture_output=True, text=True, check=True)
+        ms, pesados = out.stdout.split(' ', 1)
+        if pesados.strip():
+            print(f"Error: import antro cargó {pesados.strip()}")
+            sys.exit(1)
+        tiempos.append(float(ms))
+
+    mediana = statistics.median(tiempos)
+    print(f"import antro: mediana {mediana:.2f} ms, máx {max(tiempos):.2f} ms (n={len(tiempos)})")
+    if mediana > args.limite_ms:
+        print(f"Error: supera el límite de {args.limite_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
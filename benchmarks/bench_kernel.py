@@ -0,0 +1,74 @@
+# Kernel de z-scores por bloques (antro.zscore.lms_zscores) contra una versión
+# vectorizada directa con np.where sobre arreglos completos, ambas con el ajuste
+# restringido de la OMS más allá de ±3 SD. Mide filas/s y el pico de memoria
+# asignada (tracemalloc) y verifica que los resultados coincidan.
+# Uso: python benchmarks/bench_kernel.py [--filas N] [--bloques 1024 4096 65536]
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antro.lms import get_interpolated_lms_batch  # noqa: E402
+from antro.zscore import calculate_measurements, lms_zscores  # noqa: E402
+
+
+# Versión vectorizada directa: cada operación crea un temporal del tamaño de la entrada
+def zscores_plain(value, L, M, S):
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        small = np.abs(L) < 1e-7
+        L_safe = np.where(small, 1.0, L)
+        z = np.where(small, np.log(value / M) / S, ((value / M) ** L_safe - 1) / (L_safe * S))
+        sd3pos = M * (1 + L_safe * S * 3) ** (1 / L_safe)
+        sd2pos = M * (1 + L_safe * S * 2) ** (1 / L_safe)
+        sd3neg = M * (1 - L_safe * S * 3) ** (1 / L_safe)
+        sd2neg = M * (1 - L_safe * S * 2) ** (1 / L_safe)
+        z = np.where(z > 3, 3 + (value - sd3pos) / (sd3pos - sd2pos), z)
+        z = np.where(z < -3, -3 + (value - sd3neg) / (sd2neg - sd3neg), z)
+    z[~(value > 0)] = np.nan
+    return z
+
+
+def measure(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=2_000_000)
+    parser.add_argument('--bloques', type=int, nargs='+', default=[1024, 4096, 16384, 65536])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.filas
+    age = rng.integers(0, 3651, n).astype(float)
+    sexo = rng.choice(np.array(['m', 'f']), n)
+    peso = calculate_measurements('tablaPE', age, sexo, rng.uniform(-5, 5, n))
+    L, M, S = get_interpolated_lms_batch('tablaPE', age, sexo)
+    out = np.empty(n)
+
+    ref, t_plain, mem_plain = measure(zscores_plain, peso, L, M, S)
+    print(f"{n} filas de Peso/Edad (z entre -5 y 5)")
+    print(f"{'vectorizada':<22} {n / t_plain:>12,.0f} filas/s  pico {mem_plain / 2**20:8.1f} MB")
+    for block in args.bloques:
+        _, t, mem = measure(lambda *a: lms_zscores(*a, out=out, restricted=True, block=block), peso, L, M, S)
+        same = np.allclose(ref, out, rtol=1e-12, atol=0, equal_nan=True)
+        print(f"{'kernel bloque=' + str(block):<22} {n / t:>12,.0f} filas/s  pico {mem / 2**20:8.1f} MB  "
+              f"x{t_plain / t:.2f}  coincide={same}")
+
+
+if __name__ == '__main__':
+    main()
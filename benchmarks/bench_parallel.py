@@ -0,0 +1,63 @@
+# Escalamiento del cálculo paralelo de z-scores con 1, 2, 4 y 8 procesos, verificando
+# que el resultado sea idéntico bit a bit al de un solo proceso, de una vez y por
+# bloques de --bloque filas con los mismos procesos en todos los bloques.
+# Uso: python benchmarks/bench_parallel.py [--filas N] [--procesos 1 2 4 8] [--bloque FILAS]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antro.parallel import ParallelScorer, calculate_zscores_parallel  # noqa: E402
+from antro.zscore import calculate_zscores_batch  # noqa: E402
+
+
+def synthetic_controls(n, seed=0):
+    rng = np.random.default_rng(seed)
+    age = rng.integers(0, 7000, n).astype(float)
+    sexo = rng.choice(np.array(['M', 'F']), n)
+    talla = rng.uniform(45, 190, n)
+    peso = rng.uniform(2.5, 90, n)
+    return age, sexo, peso, talla
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=4_000_000)
+    parser.add_argument('--procesos', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--bloque', type=int, default=100_000, help='filas por bloque de la corrida por bloques')
+    args = parser.parse_args()
+
+    data = synthetic_controls(args.filas)
+    t0 = time.perf_counter()
+    ref = calculate_zscores_batch(*data)
+    base = time.perf_counter() - t0
+    print(f"{args.filas} filas, {os.cpu_count()} CPU; un proceso: {args.filas / base:,.0f} filas/s")
+
+    ok = True
+    for workers in args.procesos:
+        t0 = time.perf_counter()
+        out = calculate_zscores_parallel(*data, workers=workers)
+        dt = time.perf_counter() - t0
+        identical = all(np.array_equal(ref[c], out[c], equal_nan=True) for c in ref)
+        ok &= identical
+        print(f"procesos={workers}: {args.filas / dt:>12,.0f} filas/s  x{base / dt:.2f}  idéntico={identical}")
+
+        t0 = time.perf_counter()
+        with ParallelScorer(workers) as scorer:
+            blocks = [scorer.zscores(*[col[i:i + args.bloque] for col in data]) for i in range(0, args.filas, args.bloque)]
+        dt = time.perf_counter() - t0
+        identical = all(np.array_equal(ref[c], np.concatenate([b[c] for b in blocks]), equal_nan=True) for c in ref)
+        ok &= identical
+        print(f"  por bloques de {args.bloque}: {args.filas / dt:>12,.0f} filas/s  x{base / dt:.2f}  idéntico={identical}")
+
+    if not ok:
+        print("Error: el resultado paralelo difiere del de un solo proceso")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# Memoria por fila de los controles puntuados en el esquema del pipeline y en la
+# representación compacta de antro.records, con el tiempo de conversión de ida y
+# vuelta y el error máximo que agrega float32 en mediciones y z-scores.
+# Uso: python benchmarks/bench_records.py [--filas N]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antro.generator import generate_controls, valid_ages  # noqa: E402
+from antro.pipeline import GENERATED_COLUMNS, coerce_controls, score_controls  # noqa: E402
+from antro.records import bytes_per_row, compact_records, expand_records  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = generate_controls(args.filas, valid_ages(), np.random.default_rng(0))
+    df = score_controls(coerce_controls(df.rename(columns=GENERATED_COLUMNS)))
+
+    t0 = time.perf_counter()
+    compact = compact_records(df)
+    t_compact = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    expanded = expand_records(compact)
+    t_expand = time.perf_counter() - t0
+
+    before, after = bytes_per_row(df), bytes_per_row(compact)
+    print(f"{args.filas} filas")
+    print(f"esquema del pipeline: {before:8.1f} bytes/fila ({before * args.filas / 2**20:,.0f} MB)")
+    print(f"compacto:             {after:8.1f} bytes/fila ({after * args.filas / 2**20:,.0f} MB)  x{before / after:.1f}")
+    print(f"compactar {t_compact:.2f} s, expandir {t_expand:.2f} s")
+
+    print(f"\n{'columna':<30} {'antes':>8} {'después':>8}  tipo")
+    usage_before = df.memory_usage(deep=True, index=False) / args.filas
+    usage_after = compact.memory_usage(deep=True, index=False) / args.filas
+    for col in df.columns:
+        print(f"{col:<30} {usage_before[col]:>8.1f} {usage_after[col]:>8.1f}  {compact[col].dtype}")
+
+    worst = max(np.nanmax(np.abs(df[col].to_numpy() - expanded[col].to_numpy()))
+                for col in ['Peso', 'Talla', 'PesoEdad_Z', 'TallaEdad_Z', 'IMCEdad_Z'])
+    same = [col for col in df.columns if df[col].dtype == expanded[col].dtype]
+    print(f"\nerror máximo de ida y vuelta en mediciones y z-scores: {worst:.2e}")
+    print(f"columnas con el tipo original después de expandir: {len(same)}/{len(df.columns)}")
+
+
+if __name__ == '__main__':
+    main()
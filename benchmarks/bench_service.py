@@ -0,0 +1,135 @@
+# Prueba de carga del servicio de puntuación (python -m antro servir) en localhost:
+# levanta el servicio en un subproceso por cada ventana de micro-lote y lo carga con
+# clientes asyncio concurrentes, cada uno con su conexión keep-alive y un pedido a la
+# vez. Reporta p50/p99 de latencia, pedidos/s y controles por lote para /zscore, y
+# controles/s para /zscores con listas de --lista controles. La primera prueba usa
+# lotes de un control, como un servicio que puntúa cada pedido por separado.
+# Uso: python benchmarks/bench_service.py [--clientes 64] [--segundos 5] [--ventanas 0 2 10]
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from antro.generator import generate_controls, valid_ages  # noqa: E402
+from antro.service import REQUEST_FIELDS  # noqa: E402
+
+
+def sample_controls(n, seed=0):
+    df = generate_controls(n, valid_ages(), np.random.default_rng(seed))
+    df = df.rename(columns={'Fecha_Nacimiento': 'FechaNacimiento', 'Fecha_Control': 'FechaControl',
+                            'Peso_Kg': 'Peso', 'Talla_cm': 'Talla'})
+    return df[REQUEST_FIELDS].astype({'Peso': float, 'Talla': float}).to_dict('records')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, window_ms, max_batch=512):
+    proc = subprocess.Popen([sys.executable, '-m', 'antro', 'servir', '--puerto', str(port),
+                             '--ventana-ms', str(window_ms), '--lote-max', str(max_batch)],
+                            cwd=ROOT, stdout=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError('el servicio no arrancó')
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    data = json.loads(await reader.readexactly(length))
+    if status != 200:
+        raise RuntimeError(f'{status}: {data}')
+    return data
+
+
+# Clientes concurrentes que envían pedidos durante `seconds`; latencias en segundos
+async def load(port, path, payloads, clients, seconds):
+    latencies = []
+    stop = time.perf_counter() + seconds
+
+    async def client(k):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        i = k
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            await request(reader, writer, 'POST', path, payloads[i % len(payloads)])
+            latencies.append(time.perf_counter() - t0)
+            i += clients
+        writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(k) for k in range(clients)))
+    return np.array(latencies), time.perf_counter() - t0
+
+
+async def status(port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = await request(reader, writer, 'GET', '/estado')
+    writer.close()
+    return data
+
+
+def report(label, latencies, elapsed, per_request=1, extra=''):
+    p50, p99 = np.percentile(latencies * 1000, [50, 99])
+    print(f"{label:<26} {len(latencies) / elapsed:>9,.0f} pedidos/s  {len(latencies) * per_request / elapsed:>10,.0f} controles/s  "
+          f"p50 {p50:7.1f} ms  p99 {p99:7.1f} ms{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clientes', type=int, default=64)
+    parser.add_argument('--segundos', type=float, default=5.0)
+    parser.add_argument('--ventanas', type=float, nargs='+', default=[0, 2, 10], metavar='MS')
+    parser.add_argument('--lista', type=int, default=100, help='controles por pedido a /zscores')
+    args = parser.parse_args()
+
+    controls = sample_controls(10_000)
+    lists = [controls[i:i + args.lista] for i in range(0, len(controls), args.lista)]
+    print(f"{args.clientes} clientes concurrentes, {args.segundos:g} s por prueba, {os.cpu_count()} CPU")
+    # Sin micro-lotes (un control por cálculo) como referencia
+    runs = [('/zscore sin micro-lotes', 0, 1)] + [(f'/zscore ventana {w:g} ms', w, 512) for w in args.ventanas]
+    for label, window, max_batch in runs:
+        port = free_port()
+        proc = start_server(port, window, max_batch)
+        try:
+            latencies, elapsed = asyncio.run(load(port, '/zscore', controls, args.clientes, args.segundos))
+            state = asyncio.run(status(port))
+            report(label, latencies, elapsed,
+                   extra=f"  {state['controles_por_lote']:.1f} controles/lote")
+            if label == runs[-1][0]:
+                clients = max(1, args.clientes // 8)
+                latencies, elapsed = asyncio.run(load(port, '/zscores', lists, clients, args.segundos))
+                report(f'/zscores {args.lista} por pedido', latencies, elapsed, args.lista,
+                       extra=f'  ({clients} clientes)')
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# Exportación de resultados puntuados: cada escritor de antro.writers (CSV, Parquet,
+# Feather y Excel en streaming) contra df.to_excel con openpyxl, que es lo que hacía
+# antropy.py. Cada formato corre en un proceso aparte para medir su pico de RSS y se
+# escribe por bloques como en `antro puntuar --bloque`. Antes verifica que Parquet y
+# Feather acepten bloques con tipos distintos (un primer bloque sin fechas válidas deja
+# Edad vacía, uno sin nombres deja Nombre vacía) y devuelvan lo mismo que se escribió.
+# Uso: python benchmarks/bench_writers.py [--filas N] [--bloque FILAS] [--formatos ...]
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np  # noqa: E402
+
+FORMATS = ['to_excel', 'xlsx', 'csv', 'parquet', 'feather']
+EXTENSION = {'to_excel': '.xlsx', 'xlsx': '.xlsx', 'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
+
+
+# Resultados puntuados de n controles sintéticos
+def scored_controls(n):
+    from antro.generator import generate_controls, valid_ages
+    from antro.pipeline import GENERATED_COLUMNS, coerce_controls, score_controls
+
+    df = generate_controls(n, valid_ages(), np.random.default_rng(n))
+    return score_controls(coerce_controls(df.rename(columns=GENERATED_COLUMNS)))
+
+
+# Puntuar por bloques (como `antro puntuar --bloque`) un CSV cuyo primer bloque no
+# tiene fechas válidas ni nombres y comparar lo leído con el cálculo de una sola vez;
+# devuelve los formatos que fallan (ninguno si no está pyarrow)
+def check_block_schemas(workdir, n=400, chunk_size=100):
+    import pandas as pd
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return []
+
+    from antro.generator import generate_controls, valid_ages
+    from antro.pipeline import CSV_OPTIONS, read_controls, score_controls, score_file_chunked
+
+    raw = generate_controls(n, valid_ages(), np.random.default_rng(0))
+    raw.loc[:chunk_size - 1, 'Fecha_Nacimiento'] = 'sin fecha'
+    raw.loc[:chunk_size - 1, 'Nombre'] = ''
+    entrada = os.path.join(workdir, 'bloques.csv')
+    raw.to_csv(entrada, index=False, sep=CSV_OPTIONS['sep'], encoding=CSV_OPTIONS['encoding'])
+    expected = score_controls(read_controls(entrada))
+    failed = []
+    for formato, read in [('parquet', pd.read_parquet), ('feather', pd.read_feather)]:
+        path = os.path.join(workdir, 'bloques.' + formato)
+        try:
+            score_file_chunked(entrada, path, chunk_size, log=None)
+            back = read(path)
+            ok = back['Edad'].isna().sum() == chunk_size and (back['Edad'].iloc[chunk_size:] == expected['Edad'].iloc[chunk_size:]).all()
+            ok &= back['Nombre'].isna().sum() == chunk_size and (back['Nombre'].iloc[chunk_size:] == expected['Nombre'].iloc[chunk_size:]).all()
+            ok &= np.allclose(back['PesoEdad_Z'], expected['PesoEdad_Z'], equal_nan=True)
+        except Exception as e:
+            print(f"{formato:<9} error con bloques de tipos distintos: {type(e).__name__}: {e}")
+            ok = False
+        if not ok:
+            failed.append(formato)
+    return failed
+
+
+# Exportar en este proceso e imprimir el registro como JSON
+def run_format(formato, n, chunk_size, workdir):
+    from antro.writers import open_writer
+
+    df = scored_controls(n)
+    rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    path = os.path.join(workdir, 'salida' + EXTENSION[formato])
+    t0 = time.perf_counter()
+    if formato == 'to_excel':
+        df.to_excel(path, index=False, engine='openpyxl')
+    else:
+        with open_writer(path, formato) as writer:
+            for start in range(0, n, chunk_size):
+                writer.write(df.iloc[start:start + chunk_size])
+    seconds = time.perf_counter() - t0
+    print(json.dumps({
+        'formato': formato,
+        'segundos': seconds,
+        'filas_s': n / seconds,
+        'pico_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'rss_antes_mb': rss0,
+        'tamano_mb': os.path.getsize(path) / 2**20,
+    }))
+
+
+def main():
+    if len(sys.argv) == 6 and sys.argv[1] == '--formato':
+        run_format(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), sys.argv[5])
+        return
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filas', type=int, default=200_000)
+    parser.add_argument('--bloque', type=int, default=50_000)
+    parser.add_argument('--formatos', nargs='+', default=FORMATS, choices=FORMATS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        failed = check_block_schemas(workdir)
+    if failed:
+        print(f"Error: {', '.join(failed)} no conserva los bloques con tipos distintos")
+        sys.exit(1)
+
+    print(f"{args.filas} filas, bloques de {args.bloque}")
+    base = None
+    for formato in args.formatos:
+        with tempfile.TemporaryDirectory() as workdir:
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), '--formato', formato,
+                                  str(args.filas), str(args.bloque), workdir],
+                                 cwd=REPO_DIR, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{formato:<9} error: {out.stderr.strip().splitlines()[-1]}")
+            continue
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        if formato == 'to_excel':
+            base = r['segundos']
+        speedup = f"x{base / r['segundos']:.1f}" if base else ''
+        print(f"{formato:<9} {r['filas_s']:>12,.0f} filas/s {r['segundos']:>8.2f} s  "
+              f"RSS {r['pico_rss_mb']:7.1f} MB (+{r['pico_rss_mb'] - r['rss_antes_mb']:.1f})  "
+              f"{r['tamano_mb']:7.1f} MB  {speedup}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+# Suite de rendimiento de punta a punta: carga de tablas, pipeline de z-scores
+# (antropy.py / `antro puntuar`), recálculo de IMC de analisaLSM.py y generador de
+# listarandon.py, con datos sintéticos de 1e3 a 1e7 filas. Cada caso corre en un
+# proceso aparte para medir su pico de RSS. Registra filas/s, RSS y tiempos por etapa
+# en un JSON, controla la exactitud contra WAZ/HAZ/BAZ de calculosMuestraRandom.csv
+# y falla si el rendimiento o la exactitud empeoran respecto de una línea base.
+#
+# Uso:
+#   python benchmarks/suite.py --guardar-baseline benchmarks/baseline.json
+#   python benchmarks/suite.py --baseline benchmarks/baseline.json [--umbral 0.2]
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+CASES = ['tablas', 'puntuar', 'analisaLSM', 'generar']
+# analisaLSM.py calcula fila por fila (~1e4 filas/s): más allá de esto no termina en tiempo razonable
+MAX_ROWS = {'analisaLSM': 100_000}
+ACCURACY = [('PesoEdad_Z', 'WAZ'), ('TallaEdad_Z', 'HAZ'), ('IMCEdad_Z', 'BAZ')]
+
+
+def _synthetic_controls(n):
+    from antro.generator import generate_controls, valid_ages
+
+    return generate_controls(n, valid_ages(), np.random.default_rng(n))
+
+
+# Archivo de controles con la forma de datosAntro.csv
+def write_controls_input(path, n):
+    from antro.pipeline import CSV_OPTIONS, GENERATED_COLUMNS
+
+    df = _synthetic_controls(n).rename(columns=GENERATED_COLUMNS).rename(columns={'ID': 'id_num'})
+    df.to_csv(path, index=False, **CSV_OPTIONS)
+
+
+# Archivo con la forma de calculosMuestraRandom.csv
+def write_reference_input(path, n):
+    from antro.age import calculate_age_days
+
+    df = _synthetic_controls(n)
+    pd.DataFrame({
+        'Survey date': df['Fecha_Control'],
+        'Sex': np.where(df['Sexo'] == 'M', 'Male', 'Female'),
+        'Date of birth': df['Fecha_Nacimiento'],
+        'Age (d)': calculate_age_days(df['Fecha_Nacimiento'], df['Fecha_Control']).astype(int),
+        'Weight (kg)': df['Peso_Kg'],
+        'Height (cm)': df['Talla_cm'],
+    }).to_csv(path, sep=';', decimal=',', index=False, encoding='latin-1')
+
+
+class Stages:
+    def __init__(self):
+        self.times = {}
+
+    def run(self, name, func, *args, **kwargs):
+        t0 = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - t0
+        return result
+
+
+def case_tablas(n, workdir, stages):
+    from antro import lms
+
+    grid, manifest = os.path.join(workdir, 'tablas_lms.npy'), os.path.join(workdir, 'tablas_lms.json')
+    stages.run('leer_csv', lms.load_lms_tables)
+    stages.run('compilar', lms.compile_lms_grid, grid, manifest)
+    stages.run('cargar_mmap', lms.load_lms_grid, grid, manifest)
+
+
+def case_puntuar(n, workdir, stages):
+    from antro.pipeline import CSV_OPTIONS, read_controls, score_controls
+
+    df = stages.run('leer_csv', read_controls, os.path.join(workdir, 'entrada.csv'))
+    df = stages.run('puntuar', score_controls, df)
+    stages.run('exportar_csv', df.to_csv, os.path.join(workdir, 'salida.csv'), index=False, **CSV_OPTIONS)
+
+
+def case_analisaLSM(n, workdir, stages):
+    import analisaLSM
+
+    df = stages.run('leer_csv', pd.read_csv, os.path.join(workdir, 'entrada.csv'), sep=';', decimal=',', encoding='latin-1')
+    lms_tables = stages.run('tablas', analisaLSM.load_lms_tables, os.path.join(REPO_DIR, 'tablaIMCx.csv'))
+    stages.run('recalcular_imc', analisaLSM.recalculate_bmi_zscores, df, lms_tables)
+
+
+def case_generar(n, workdir, stages):
+    from antro.generator import generate_controls, valid_ages
+
+    ages = stages.run('edades', valid_ages)
+    df = stages.run('generar', generate_controls, n, ages, np.random.default_rng(0))
+    stages.run('exportar_csv', df.to_csv, os.path.join(workdir, 'salida.csv'), sep=';', index=False)
+
+
+# Ejecutar un caso dentro de este proceso e imprimir su registro como JSON
+def run_case(case, n, workdir):
+    stages = Stages()
+    t0 = time.perf_counter()
+    globals()['case_' + case](n, workdir, stages)
+    seconds = time.perf_counter() - t0
+    record = {
+        'caso': case,
+        'filas': n,
+        'segundos': seconds,
+        'pico_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'etapas': stages.times,
+    }
+    if n:
+        record['filas_s'] = n / seconds
+    print(json.dumps(record))
+
+
+# Preparar la entrada en este proceso y medir el caso en un proceso nuevo
+def measure(case, n):
+    with tempfile.TemporaryDirectory() as workdir:
+        if case == 'puntuar':
+            write_controls_input(os.path.join(workdir, 'entrada.csv'), n)
+        elif case == 'analisaLSM':
+            write_reference_input(os.path.join(workdir, 'entrada.csv'), n)
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--caso', case, str(n or 0), workdir],
+                             cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# Exactitud de los z-scores contra los valores de referencia WAZ/HAZ/BAZ
+def accuracy():
+    from antro.zscore import calculate_zscores_batch
+
+    df = pd.read_csv(os.path.join(REPO_DIR, 'calculosMuestraRandom.csv'), sep=';', decimal=',', encoding='latin-1')
+    for col in ['Age (d)', 'Weight (kg)', 'Height (cm)', 'WAZ', 'HAZ', 'BAZ']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    z = calculate_zscores_batch(df['Age (d)'], df['Sex'].str[0], df['Weight (kg)'], df['Height (cm)'])
+    result = {}
+    for col, ref in ACCURACY:
+        diff = (z[col] - df[ref].to_numpy())
+        diff = diff[~np.isnan(diff)]
+        result[ref] = {'n': int(len(diff)), 'mae': float(np.mean(np.abs(diff))),
+                       'max': float(np.max(np.abs(diff))), 'dentro_0_05': float(np.mean(np.abs(diff) <= 0.05 + 1e-9))}
+    return result
+
+
+# Comparar contra la línea base; devuelve la lista de regresiones
+def compare(results, baseline, threshold):
+    failures = []
+    base_runs = {(r['caso'], r['filas']): r for r in baseline.get('corridas', [])}
+    for r in results['corridas']:
+        b = base_runs.get((r['caso'], r['filas']))
+        if b is None:
+            continue
+        if 'filas_s' in r:
+            if r['filas_s'] < b['filas_s'] * (1 - threshold):
+                failures.append(f"{r['caso']} n={r['filas']}: {r['filas_s']:,.0f} filas/s vs {b['filas_s']:,.0f} en la línea base")
+        elif r['segundos'] > b['segundos'] * (1 + threshold):
+            failures.append(f"{r['caso']}: {r['segundos']:.3f} s vs {b['segundos']:.3f} s en la línea base")
+    for ref, acc in results['exactitud'].items():
+        b = baseline.get('exactitud', {}).get(ref)
+        if b is not None and (acc['mae'] > b['mae'] + 1e-9 or acc['n'] < b['n']):
+            failures.append(f"exactitud {ref}: MAE {acc['mae']:.6f} (n={acc['n']}) vs {b['mae']:.6f} (n={b['n']}) en la línea base")
+    return failures
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == '--caso':
+        run_case(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        return
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--casos', nargs='+', default=CASES, choices=CASES)
+    parser.add_argument('--tamanos', nargs='+', type=lambda s: int(float(s)), default=SIZES)
+    parser.add_argument('--salida', default=os.path.join(REPO_DIR, 'benchmarks', 'resultados.json'))
+    parser.add_argument('--baseline', default=None, help='JSON de una corrida anterior contra el que comparar')
+    parser.add_argument('--umbral', type=float, default=0.2, help='caída de rendimiento tolerada (fracción)')
+    parser.add_argument('--guardar-baseline', default=None, metavar='ARCHIVO')
+    args = parser.parse_args()
+
+    results = {'python': platform.python_version(), 'cpu': os.cpu_count(), 'corridas': []}
+    for case in args.casos:
+        sizes = [None] if case == 'tablas' else [n for n in args.tamanos if n <= MAX_ROWS.get(case, n)]
+        for n in sizes:
+            r = measure(case, n)
+            results['corridas'].append(r)
+            etapas = ', '.join(f"{k} {v:.3f}s" for k, v in r['etapas'].items())
+            rate = f"{r['filas_s']:>12,.0f} filas/s" if 'filas_s' in r else f"{r['segundos']:>10.3f} s"
+            print(f"{case:<11} {r['filas']:>10,} {rate}  RSS {r['pico_rss_mb']:7.1f} MB  [{etapas}]")
+
+    results['exactitud'] = accuracy()
+    for ref, acc in results['exactitud'].items():
+        print(f"exactitud {ref}: MAE {acc['mae']:.4f}, máx {acc['max']:.3f}, |dif| <= 0.05 en {acc['dentro_0_05']:.1%} (n={acc['n']})")
+
+    with open(args.salida, 'w') as f:
+        json.dump(results, f, indent=2)
+    if args.guardar_baseline:
+        with open(args.guardar_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f), args.umbral)
+        if failures:
+            print("\nRegresiones:")
+            for failure in failures:
+                print('  ' + failure)
+            sys.exit(1)
+        print("\nSin regresiones respecto de la línea base")
+
+
+if __name__ == '__main__':
+    main()
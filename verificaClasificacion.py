@@ -0,0 +1,133 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from antro.age import calculate_age_days
+from antro.classification import classify_weight, classify_height
+from antro.pipeline import read_controls, score_controls
+
+# Comparar la clasificación en Python con la guardada en datosAntro.csv (salida de MySQL).
+# Ese archivo se generó con una versión anterior de las reglas; con sus propios
+# ZPE/ZTE/ZIMC la clasificación de Python tiene que coincidir salvo en estas
+# diferencias conocidas, y cualquier otra hace fallar el script:
+#   - Peso 'SD' cuando no hay Peso/Edad (> 10 años); las reglas actuales no tienen SD
+#   - Peso reclasificado por IMC/Edad después de los 730 días (antes solo contaba Peso/Edad)
+#   - Talla 'AT' para TallaEdad >= 2, que las reglas actuales dejan en 'AD'
+#   - z justo en un límite de categoría: el archivo guarda los z redondeados a 2
+#     decimales y la clasificación se hizo con el valor sin redondear
+# Como la excepción de IMC/Edad cubre casi todas las filas donde decide el IMC, antes
+# se verifican las reglas con casos armados a mano: cada límite del CASE y las ramas
+# de IMC/Edad a los 730 y 731 días
+LIMITES_PESO = [-6, -3, -2, -1.5, 2, 6]
+LIMITES_TALLA = [-6, -3, -2, -1.5, 6]
+
+df_data = pd.read_csv('datosAntro.csv', sep=';', decimal=',', encoding='latin-1', na_values=['NULL'])
+for col in ['ZPE', 'ZTE', 'ZIMC']:
+    df_data[col] = pd.to_numeric(df_data[col], errors='coerce')
+dias = calculate_age_days(df_data['FechaNacimiento'], df_data['FechaControl'])
+
+# (PesoEdad, IMCEdad, DiasEdad, ClasificacionPeso esperada según calcula_generados.sql)
+CASOS_PESO = [
+    (6.01, np.nan, 365, 'Error'), (-6.01, np.nan, 365, 'Error'), (0, 6.01, 365, 'Error'), (0, -6.01, 365, 'Error'),
+    (6, np.nan, 365, 'SP'), (-6, np.nan, 365, 'MBP'),
+    (-3.01, np.nan, 365, 'MBP'), (-3, np.nan, 365, 'BP'),
+    (-2.01, np.nan, 365, 'BP'), (-2, np.nan, 365, 'RBP'),
+    (-1.51, np.nan, 365, 'RBP'), (-1.5, np.nan, 365, 'AD'),
+    (1.99, np.nan, 365, 'AD'), (2.01, np.nan, 365, 'SP'),
+    (2, np.nan, 365, 'NULL'),  # 2 exacto no entra en ninguna rama: SP es > 2 y AD es < 2
+    (np.nan, np.nan, 365, 'NULL'),
+    # IMC/Edad solo cuenta después de los 730 días
+    (0, -3.01, 730, 'AD'), (0, -3.01, 731, 'MBP'),
+    (0, -2.5, 730, 'AD'), (0, -2.5, 731, 'BP'),
+    (0, -1.75, 730, 'AD'), (0, -1.75, 731, 'RBP'),
+    (0, 2.01, 730, 'AD'), (0, 2.01, 731, 'SP'),
+    # Límites de IMC/Edad; -3 exacto no entra en ninguna rama de IMC (MBP es < -3 y BP es > -3)
+    (0, -3, 731, 'AD'), (0, -2, 731, 'BP'), (0, -1.5, 731, 'RBP'), (0, -1.49, 731, 'AD'), (0, 2, 731, 'AD'),
+    # Sin Peso/Edad decide solo el IMC; AD necesita Peso/Edad
+    (np.nan, -2.5, 731, 'BP'), (np.nan, 2.5, 731, 'SP'), (np.nan, 0, 731, 'NULL'),
+    # Gana la primera rama verdadera del CASE
+    (-2.5, -3.5, 731, 'MBP'), (2.5, -3.5, 731, 'MBP'), (-3.5, 2.5, 731, 'MBP'), (-1.75, 2.5, 731, 'RBP'),
+]
+# (TallaEdad, ClasificacionTalla esperada); AT no se alcanza porque AD cubre todo > -1.5
+CASOS_TALLA = [
+    (6.01, 'Error'), (-6.01, 'Error'), (6, 'AD'), (-6, 'MBT'),
+    (-3, 'MBT'), (-2.99, 'BT'), (-2, 'BT'), (-1.99, 'RBT'), (-1.5, 'RBT'), (-1.49, 'AD'),
+    (2, 'AD'), (3, 'AD'), (np.nan, 'NULL'),
+]
+
+
+def como_texto(valores):
+    return pd.Series(valores, dtype=object).fillna('NULL').to_numpy()
+
+
+# 0) Reglas con z armados a mano
+errores = 0
+pe, imc, edad_casos, esperada = map(np.array, zip(*CASOS_PESO))
+for nombre, calculada, esperada, entradas in [
+    ('ClasificacionPeso', como_texto(classify_weight(pe.astype(float), imc.astype(float), edad_casos.astype(float))),
+     esperada, [f'PesoEdad={a} IMCEdad={b} DiasEdad={c}' for a, b, c, _ in CASOS_PESO]),
+    ('ClasificacionTalla', como_texto(classify_height([te for te, _ in CASOS_TALLA])),
+     np.array([cat for _, cat in CASOS_TALLA]), [f'TallaEdad={te}' for te, _ in CASOS_TALLA]),
+]:
+    fallan = np.flatnonzero(calculada != esperada)
+    print(f"=== Reglas de {nombre}: {len(esperada) - len(fallan)}/{len(esperada)} casos correctos ===")
+    for i in fallan:
+        print(f"  {entradas[i]}: esperada {esperada[i]}, obtenida {calculada[i]}")
+    errores += len(fallan)
+
+
+# z a menos de medio centésimo de algún límite
+def en_limite(z, limites):
+    z = np.asarray(z, dtype=float)
+    return np.any([np.abs(z - b) <= 0.005 for b in limites], axis=0)
+
+
+# 1) Mismas entradas que el SQL: z-scores ZPE/ZTE/ZIMC del archivo
+peso_sql = como_texto(classify_weight(df_data['ZPE'], df_data['ZIMC'], dias))
+peso_sin_imc = como_texto(classify_weight(df_data['ZPE'], np.full(len(df_data), np.nan), dias))
+talla_sql = como_texto(classify_height(df_data['ZTE']))
+peso_ref = df_data['ClasificacionPeso'].fillna('NULL').to_numpy()
+talla_ref = df_data['ClasificacionTalla'].fillna('NULL').to_numpy()
+
+conocidas_peso = ((peso_ref == 'SD') & df_data['ZPE'].isna().to_numpy()
+                  | (dias > 730) & (peso_sql != peso_sin_imc) & (peso_ref == peso_sin_imc)
+                  | en_limite(df_data['ZPE'], LIMITES_PESO))
+conocidas_talla = ((talla_ref == 'AT') & (df_data['ZTE'] >= 2).to_numpy() & (talla_sql == 'AD')
+                   | en_limite(df_data['ZTE'], LIMITES_TALLA))
+
+# 2) Z-scores calculados en Python (solo informativo: los z difieren de los de MySQL)
+scored = score_controls(read_controls('datosAntro.csv'))
+
+for nombre, calculada, referencia, conocidas in [
+    ('ClasificacionPeso (z del archivo)', peso_sql, peso_ref, conocidas_peso),
+    ('ClasificacionTalla (z del archivo)', talla_sql, talla_ref, conocidas_talla),
+    ('ClasificacionPeso (z de Python)', como_texto(scored['ClasificacionPeso_calculada']), peso_ref, None),
+    ('ClasificacionTalla (z de Python)', como_texto(scored['ClasificacionTalla_calculada']), talla_ref, None),
+]:
+    iguales = calculada == referencia
+    print(f"\n=== {nombre}: {iguales.sum()}/{len(iguales)} coincidencias ===")
+    print(pd.crosstab(pd.Series(referencia, name='MySQL'), pd.Series(calculada, name='Python')))
+    if conocidas is not None:
+        inesperadas = ~iguales & ~conocidas
+        print(f"Diferencias conocidas: {int((~iguales & conocidas).sum())}, inesperadas: {int(inesperadas.sum())}")
+        if inesperadas.any():
+            errores += int(inesperadas.sum())
+            print(df_data.loc[inesperadas, ['id_num', 'ZPE', 'ZTE', 'ZIMC', 'ClasificacionPeso', 'ClasificacionTalla']]
+                  .assign(Python=calculada[inesperadas]).to_string())
+
+# Rendimiento con un millón de filas
+n = 1_000_000
+rng = np.random.default_rng(0)
+z = rng.normal(0, 2.5, (3, n))
+z[0, rng.random(n) < 0.3] = np.nan
+edad = rng.integers(0, 6935, n)
+t0 = time.perf_counter()
+classify_weight(z[0], z[2], edad)
+classify_height(z[1])
+print(f"\nClasificación de {n} filas: {time.perf_counter() - t0:.3f} s")
+
+if errores:
+    print(f"\nError: {errores} clasificaciones distintas de las reglas o fuera de las diferencias conocidas")
+    sys.exit(1)